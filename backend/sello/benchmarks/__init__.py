@@ -0,0 +1,12 @@
+"""
+Performance benchmarks for the sello backend.
+
+Each module runs against a throwaway database created the same way the test
+runner creates one, e.g. from ``backend/sello``::
+
+    python -m benchmarks.api --output before.json       # end-to-end scenarios
+    python -m benchmarks.compare before.json after.json
+    python -m benchmarks.login_storm --duration 10
+
+``benchmarks.data`` seeds the synthetic data the scenarios run against.
+"""
@@ -0,0 +1,216 @@
+"""
+End-to-end API benchmark: scripted scenarios against seeded data.
+
+Each scenario drives one endpoint through the full Django stack (URL
+routing, JWT authentication, views, serializers, database) with the test
+client and records latency, throughput, query count and status codes. The
+report is JSON so runs on different commits can be diffed with
+``benchmarks.compare``::
+
+    python -m benchmarks.api --output before.json
+    python -m benchmarks.api --scenarios product_list,checkout --iterations 500
+
+Work a scenario needs before each request (filling a cart for checkout,
+emptying the cache for ``product_list_cold``) is not timed.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from benchmarks import data
+from benchmarks.support import benchmark_database, latency_summary, percentile, setup_django
+
+WARMUP = 5
+
+
+class Request:
+    def __init__(self, method, path, user=None, payload=None):
+        self.method = method
+        self.path = path
+        self.user = user
+        self.payload = payload
+
+
+def signin(dataset, rng, i):
+    user = rng.choice(dataset.customers)
+    return Request('post', '/users/signin/', payload={'email': user.email, 'password': data.PASSWORD})
+
+
+def product_list(dataset, rng, i):
+    return Request('get', '/users/products/', user=rng.choice(dataset.customers))
+
+
+def product_list_cold(dataset, rng, i):
+    from django.core.cache import cache
+
+    from users.authentication import principal_cache
+    from users.cache import catalog_cache
+
+    cache.clear()
+    catalog_cache.local.clear()
+    principal_cache.local.clear()
+    return Request('get', '/users/products/', user=rng.choice(dataset.customers))
+
+
+def cart_add(dataset, rng, i):
+    return Request(
+        'post', '/users/cart/', user=rng.choice(dataset.customers),
+        payload={'product_id': rng.choice(dataset.product_ids), 'quantity': 1},
+    )
+
+
+def checkout(dataset, rng, i):
+    from users.cart import apply_cart_operations
+
+    user = rng.choice(dataset.customers)
+    apply_cart_operations(user, [
+        {'op': 'add', 'product_id': product_id, 'quantity': rng.randint(1, 3)}
+        for product_id in rng.sample(dataset.product_ids, 3)
+    ])
+    return Request('post', '/users/orders/', user=user, payload={'shipping_address': '1 Benchmark Road'})
+
+
+def customer_dashboard(dataset, rng, i):
+    return Request('get', '/users/dashboard/', user=rng.choice(dataset.customers))
+
+
+def shopkeeper_dashboard(dataset, rng, i):
+    return Request('get', '/users/dashboard/', user=rng.choice(dataset.shopkeepers))
+
+
+SCENARIOS = {
+    'signin': signin,
+    'product_list': product_list,
+    'product_list_cold': product_list_cold,
+    'cart_add': cart_add,
+    'checkout': checkout,
+    'customer_dashboard': customer_dashboard,
+    'shopkeeper_dashboard': shopkeeper_dashboard,
+}
+
+
+class Runner:
+    def __init__(self, dataset, seed):
+        from django.test import Client
+
+        self.dataset = dataset
+        self.seed = seed
+        self.client = Client()
+        self.tokens = {}
+
+    def auth_headers(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        if user is None:
+            return {}
+        if user.pk not in self.tokens:
+            self.tokens[user.pk] = str(AccessToken.for_user(user))
+        return {'Authorization': f'Bearer {self.tokens[user.pk]}'}
+
+    def send(self, request):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        headers = self.auth_headers(request.user)
+        send = getattr(self.client, request.method)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            if request.payload is None:
+                response = send(request.path, headers=headers)
+            else:
+                response = send(request.path, request.payload, content_type='application/json', headers=headers)
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, len(queries.captured_queries)
+
+    def run(self, name, iterations):
+        build = SCENARIOS[name]
+        rng = random.Random(f'{self.seed}:{name}')
+        latencies, query_counts, statuses = [], [], Counter()
+        for i in range(WARMUP + iterations):
+            status_code, elapsed, query_count = self.send(build(self.dataset, rng, i))
+            if i < WARMUP:
+                continue
+            latencies.append(elapsed)
+            query_counts.append(query_count)
+            statuses[str(status_code)] += 1
+
+        return {
+            'requests': iterations,
+            'throughput_rps': round(iterations / sum(latencies), 1) if latencies else None,
+            'latency': latency_summary(latencies),
+            'queries': {
+                'min': min(query_counts, default=None),
+                'p50': percentile(query_counts, 50),
+                'max': max(query_counts, default=None),
+            },
+            'status_codes': dict(statuses),
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated, default: all')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--customers', type=int, default=200)
+    parser.add_argument('--shopkeepers', type=int, default=20)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=5, help='orders per customer')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = sorted(set(names) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    setup_django()
+
+    import django
+    from django.db import connection
+
+    with benchmark_database():
+        started = time.perf_counter()
+        dataset = data.generate(
+            customers=args.customers, shopkeepers=args.shopkeepers, products=args.products,
+            orders=args.orders, seed=args.seed,
+        )
+        seed_seconds = time.perf_counter() - started
+        runner = Runner(dataset, args.seed)
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'iterations': args.iterations,
+                'seed': args.seed,
+            },
+            'dataset': dataset.as_dict() | {'seed_seconds': round(seed_seconds, 2)},
+            'scenarios': {name: runner.run(name, args.iterations) for name in names},
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
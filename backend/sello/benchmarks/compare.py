@@ -0,0 +1,82 @@
+"""
+Compare two ``benchmarks.api`` reports scenario by scenario.
+
+Prints the change in p50/p95/p99 latency, throughput and median query count
+from the baseline to the candidate run, and exits with status 1 when any
+scenario's p95 got slower by more than ``--threshold`` percent or issues
+more queries::
+
+    python -m benchmarks.compare before.json after.json --threshold 15
+"""
+import argparse
+import json
+import sys
+
+COLUMNS = [
+    ('p50 ms', ('latency', 'p50_ms')),
+    ('p95 ms', ('latency', 'p95_ms')),
+    ('p99 ms', ('latency', 'p99_ms')),
+    ('req/s', ('throughput_rps',)),
+    ('queries', ('queries', 'p50')),
+]
+
+
+def lookup(result, path):
+    for key in path:
+        result = (result or {}).get(key)
+    return result
+
+
+def change(before, after):
+    if before in (None, 0) or after is None:
+        return ''
+    return f'{(after - before) / before * 100:+.0f}%'
+
+
+def compare(baseline, candidate, threshold):
+    rows, regressions = [], []
+    for name in sorted(set(baseline['scenarios']) & set(candidate['scenarios'])):
+        before, after = baseline['scenarios'][name], candidate['scenarios'][name]
+        cells = [name]
+        for _, path in COLUMNS:
+            old, new = lookup(before, path), lookup(after, path)
+            cells.append(f'{old} -> {new} {change(old, new)}'.strip())
+        rows.append(cells)
+
+        old_p95, new_p95 = lookup(before, ('latency', 'p95_ms')), lookup(after, ('latency', 'p95_ms'))
+        if old_p95 and new_p95 and (new_p95 - old_p95) / old_p95 * 100 > threshold:
+            regressions.append(f'{name}: p95 {old_p95} ms -> {new_p95} ms')
+        old_queries, new_queries = lookup(before, ('queries', 'p50')), lookup(after, ('queries', 'p50'))
+        if old_queries is not None and new_queries is not None and new_queries > old_queries:
+            regressions.append(f'{name}: queries {old_queries} -> {new_queries}')
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0, help='allowed p95 slowdown in percent')
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    header = ['scenario'] + [title for title, _ in COLUMNS]
+    widths = [max(len(str(row[i])) for row in rows + [header]) for i in range(len(header))]
+    print(f"{baseline['meta'].get('revision')} -> {candidate['meta'].get('revision')}")
+    for row in [header] + rows:
+        print('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+
+    if regressions:
+        print('\nRegressions:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Seeded synthetic data for benchmarks.
+
+``generate()`` fills an empty database with customers, shopkeepers,
+products, cart lines and orders using ``bulk_create`` only, so tens of
+thousands of rows take seconds. The same seed always produces the same
+data, which keeps runs on different commits comparable. Everything is
+created with one password, ``PASSWORD``.
+"""
+import random
+from decimal import Decimal
+
+PASSWORD = 'Benchmark-password-1234'
+BATCH_SIZE = 1000
+
+
+class Dataset:
+    def __init__(self, customers, shopkeepers, product_ids):
+        self.customers = customers
+        self.shopkeepers = shopkeepers
+        self.product_ids = product_ids
+
+    def as_dict(self):
+        from users.models import CartItem, Order, OrderItem
+
+        return {
+            'customers': len(self.customers),
+            'shopkeepers': len(self.shopkeepers),
+            'products': len(self.product_ids),
+            'cart_items': CartItem.objects.count(),
+            'orders': Order.objects.count(),
+            'order_items': OrderItem.objects.count(),
+        }
+
+
+def generate(customers=200, shopkeepers=20, products=2000, cart_items=3, orders=5, items_per_order=3, seed=0):
+    """Create the data set (counts are per customer for carts and orders) and return a ``Dataset``."""
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+
+    from users.models import CartItem, Order, OrderItem, Product, User
+    from users.sales import rebuild_sales_rollups
+    from users.shopkeeper_orders import rebuild_order_shopkeepers
+
+    rng = random.Random(seed)
+    encoded = make_password(PASSWORD)
+
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(email=f'customer{i}@bench.example.com', password=encoded,
+                 first_name='Customer', last_name=str(i), role='CUSTOMER')
+            for i in range(customers)
+        ] + [
+            User(email=f'shopkeeper{i}@bench.example.com', password=encoded,
+                 first_name='Shopkeeper', last_name=str(i), role='SHOPKEEPER')
+            for i in range(shopkeepers)
+        ], batch_size=BATCH_SIZE)
+        customer_users = list(User.objects.filter(role='CUSTOMER').order_by('id'))
+        shopkeeper_users = list(User.objects.filter(role='SHOPKEEPER').order_by('id'))
+
+        categories = sorted(Product.SUBCATEGORY_CHOICES)
+        new_products = []
+        for i in range(products):
+            category = rng.choice(categories)
+            new_products.append(Product(
+                name=f'{rng.choice(Product.SUBCATEGORY_CHOICES[category])} {i}',
+                description=f'Synthetic {category.lower()} product number {i}.',
+                price=Decimal(rng.randint(100, 50000)) / 100,
+                category=category,
+                subcategory=rng.choice(Product.SUBCATEGORY_CHOICES[category]),
+                # Plenty, so checkout scenarios never run out.
+                stock=1_000_000,
+                created_by=shopkeeper_users[i % len(shopkeeper_users)],
+            ))
+        Product.objects.bulk_create(new_products, batch_size=BATCH_SIZE)
+        prices = dict(Product.objects.values_list('id', 'price'))
+        names = dict(Product.objects.values_list('id', 'name'))
+        product_ids = sorted(prices)
+
+        CartItem.objects.bulk_create([
+            CartItem(user=customer, product_id=product_id, quantity=rng.randint(1, 5))
+            for customer in customer_users
+            for product_id in rng.sample(product_ids, min(cart_items, len(product_ids)))
+        ], batch_size=BATCH_SIZE)
+
+        order_lines = []
+        new_orders = []
+        for customer in customer_users:
+            for _ in range(orders):
+                lines = [
+                    (product_id, rng.randint(1, 5))
+                    for product_id in rng.sample(product_ids, min(items_per_order, len(product_ids)))
+                ]
+                new_orders.append(Order(
+                    user=customer,
+                    status=rng.choice(Order.STATUS_CHOICES)[0],
+                    total_amount=sum(prices[product_id] * quantity for product_id, quantity in lines),
+                    shipping_address=f'{rng.randint(1, 999)} Benchmark Road',
+                ))
+                order_lines.append(lines)
+        Order.objects.bulk_create(new_orders, batch_size=BATCH_SIZE)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=product_id, quantity=quantity,
+                      price=prices[product_id], product_name=names[product_id])
+            for order, lines in zip(new_orders, order_lines)
+            for product_id, quantity in lines
+        ], batch_size=BATCH_SIZE)
+
+        # Orders were bulk-created, so the sales rollups and shopkeeper links have to be rebuilt.
+        rebuild_sales_rollups()
+        rebuild_order_shopkeepers()
+
+    return Dataset(customer_users, shopkeeper_users, product_ids)
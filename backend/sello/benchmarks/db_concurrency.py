@@ -0,0 +1,125 @@
+"""
+Write concurrency per database profile: concurrent checkouts.
+
+Each worker thread is a customer who repeatedly adds a product to the cart
+and checks out through the full request stack, with connections opened and
+closed per request as a WSGI server would (so ``CONN_MAX_AGE`` matters).
+Every profile (see ``DB_PROFILE`` in settings) runs in its own process on a
+fresh database file::
+
+    python -m benchmarks.db_concurrency --threads 8 --duration 10
+    python -m benchmarks.db_concurrency --profiles sqlite-basic,sqlite
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+from benchmarks import data
+from benchmarks.support import benchmark_database, latency_summary, setup_django
+
+
+def run_workers(dataset, threads, duration):
+    from django.db import close_old_connections, connection
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    deadline = time.monotonic() + duration
+    latencies, statuses, errors = [], Counter(), Counter()
+    lock = threading.Lock()
+
+    def worker(n):
+        user = dataset.customers[n]
+        client = Client(raise_request_exception=False)
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        i = n
+        try:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                responses = [
+                    client.post('/users/cart/', {'product_id': dataset.product_ids[i % len(dataset.product_ids)]},
+                                content_type='application/json', headers=headers),
+                    client.post('/users/orders/', {'shipping_address': '1 Benchmark Road'},
+                                content_type='application/json', headers=headers),
+                ]
+                elapsed = time.perf_counter() - started
+                close_old_connections()
+                with lock:
+                    for response in responses:
+                        statuses[str(response.status_code)] += 1
+                        if response.status_code >= 500:
+                            errors[getattr(response, 'exc_info', (None, None))[1].__class__.__name__] += 1
+                    if all(response.status_code == 201 for response in responses):
+                        latencies.append(elapsed)
+                i += threads
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'checkouts_per_second': round(len(latencies) / elapsed, 1),
+        'checkout_latency': latency_summary(latencies),
+        'status_codes': dict(statuses),
+        'errors': dict(errors),
+    }
+
+
+def run_profile(args):
+    setup_django()
+
+    from django.db import connection
+
+    with benchmark_database():
+        dataset = data.generate(customers=args.threads, shopkeepers=2, products=200, orders=0, seed=0)
+        connection.close()
+        result = run_workers(dataset, args.threads, args.duration)
+        result['settings'] = {
+            'engine': connection.settings_dict['ENGINE'],
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'options': {key: value for key, value in connection.settings_dict['OPTIONS'].items()},
+        }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', default='sqlite-basic,sqlite')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--profile', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        run_profile(args)
+        return
+
+    results = {}
+    for profile in args.profiles.split(','):
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.db_concurrency', '--profile', profile,
+             '--threads', str(args.threads), '--duration', str(args.duration)],
+            env=os.environ | {'DB_PROFILE': profile}, capture_output=True, text=True, check=True,
+        )
+        results[profile] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    report = json.dumps(results, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
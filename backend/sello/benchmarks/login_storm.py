@@ -0,0 +1,122 @@
+"""
+Login storm: sign-in throughput and the latency of an unrelated endpoint
+while many clients log in at once.
+
+Runs the same storm against the synchronous DRF ``SignInView`` and the async
+``users.async_views.sign_in`` through Django's ASGI handler, probing
+``GET /users/cart/`` throughout::
+
+    python -m benchmarks.login_storm --concurrency 16 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.support import benchmark_database, latency_summary, setup_django
+
+PASSWORD = 'Storm-password-1234'
+
+urlpatterns = []
+
+
+def build_urlpatterns():
+    from django.urls import include, path
+
+    from users import async_views
+    from users.views import SignInView
+
+    urlpatterns[:] = [
+        path('sync/signin/', SignInView.as_view()),
+        path('async/signin/', async_views.sign_in),
+        path('users/', include('users.urls')),
+    ]
+
+
+async def run_storm(mode, emails, access_token, concurrency, duration):
+    from django.test import AsyncClient
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    logins = []
+    probe_latencies = []
+
+    async def login_worker(worker):
+        client = AsyncClient()
+        n = worker
+        while loop.time() < deadline:
+            started = time.perf_counter()
+            response = await client.post(
+                f'/{mode}/signin/',
+                {'email': emails[n % len(emails)], 'password': PASSWORD},
+                content_type='application/json',
+            )
+            assert response.status_code == 200, response.content
+            logins.append(time.perf_counter() - started)
+            n += concurrency
+
+    async def probe():
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {access_token}'}
+        while loop.time() < deadline:
+            started = time.perf_counter()
+            response = await client.get('/users/cart/', headers=headers)
+            assert response.status_code == 200, response.content
+            probe_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.005)
+
+    started = time.perf_counter()
+    workers = [login_worker(i) for i in range(concurrency)]
+    await asyncio.gather(*workers, probe())
+    elapsed = time.perf_counter() - started
+
+    return {
+        'mode': mode,
+        'concurrency': concurrency,
+        'logins_per_second': round(len(logins) / elapsed, 2),
+        'login_latency': latency_summary(logins),
+        'probe_latency': latency_summary(probe_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    setup_django()
+    build_urlpatterns()
+
+    from django.contrib.auth.hashers import make_password
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from users.models import User
+
+    with benchmark_database(), override_settings(ROOT_URLCONF=__name__):
+        encoded = make_password(PASSWORD)
+        User.objects.bulk_create([
+            User(email=f'storm{i}@example.com', password=encoded, first_name='Storm', last_name=str(i))
+            for i in range(args.users)
+        ])
+        emails = list(User.objects.values_list('email', flat=True))
+        access_token = str(AccessToken.for_user(User.objects.first()))
+
+        results = {
+            'idle_probe': asyncio.run(run_storm('async', emails, access_token, 0, args.duration / 2)),
+            'sync': asyncio.run(run_storm('sync', emails, access_token, args.concurrency, args.duration)),
+            'async': asyncio.run(run_storm('async', emails, access_token, args.concurrency, args.duration)),
+        }
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Serializer throughput: ``ModelSerializer`` over model instances versus the
+compiled ``ValuesSerializer`` over ``values()`` rows.
+
+Each round fetches and renders one page of products and one page of orders
+(with items) to JSON both ways, checks the bytes are identical, and reports
+rows rendered per second including the queries::
+
+    python -m benchmarks.serializers --page-size 100 --rounds 200
+"""
+import argparse
+import json
+import time
+
+from benchmarks.support import benchmark_database, setup_django
+
+
+def seed(products, orders, items_per_order):
+    from decimal import Decimal
+
+    from users.models import Order, OrderItem, Product, User
+
+    shopkeeper = User.objects.create_user(
+        email='bench-shop@example.com', password=None, first_name='Bench', last_name='Shop', role='SHOPKEEPER'
+    )
+    customer = User.objects.create_user(
+        email='bench-customer@example.com', password=None, first_name='Bench', last_name='Customer'
+    )
+    Product.objects.bulk_create([
+        Product(
+            name=f'Product {i}', description='Benchmark product ' * 4, price=Decimal('10.00') + i % 90,
+            category='Dairy', subcategory='Milk', stock=100, created_by=shopkeeper,
+            image=f'products/product-{i}.png' if i % 2 else None,
+        )
+        for i in range(products)
+    ])
+    product_list = list(Product.objects.all())
+    created = Order.objects.bulk_create([
+        Order(user=customer, total_amount=Decimal('100.00'), shipping_address='1 Bench Street')
+        for _ in range(orders)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=2, price=product.price, product_name=product.name)
+        for n, order in enumerate(created)
+        for product in product_list[n % len(product_list):][:items_per_order]
+    ])
+
+
+def measure(render, rounds):
+    render()  # warm up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        render()
+    return time.perf_counter() - started
+
+
+def compare(serializer_class, queryset, context, rounds):
+    from rest_framework.renderers import JSONRenderer
+
+    from users.compiled import ValuesSerializer
+
+    renderer = JSONRenderer()
+    eager = serializer_class.setup_eager_loading(queryset)
+    compiled = ValuesSerializer(serializer_class, context=context)
+
+    def render_model():
+        return renderer.render(serializer_class(list(eager), many=True, context=context).data)
+
+    def render_compiled():
+        return renderer.render(compiled.to_representation(compiled.get_queryset(queryset)))
+
+    assert render_model() == render_compiled(), f'{serializer_class.__name__} output differs'
+    rows = queryset.count()
+    model_seconds = measure(render_model, rounds)
+    compiled_seconds = measure(render_compiled, rounds)
+    return {
+        'rows_per_page': rows,
+        'model_rows_per_second': round(rows * rounds / model_seconds),
+        'compiled_rows_per_second': round(rows * rounds / compiled_seconds),
+        'speedup': round(model_seconds / compiled_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--items-per-order', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--output', help='write the JSON report to this file')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from users.models import Order, Product
+    from users.serializers import OrderSerializer, ProductSerializer
+
+    with benchmark_database():
+        seed(args.page_size, args.page_size, args.items_per_order)
+        context = {'request': Request(APIRequestFactory().get('/'))}
+        page = slice(0, args.page_size)
+        results = {
+            'products': compare(
+                ProductSerializer, Product.objects.order_by('-created_at', '-id')[page], context, args.rounds
+            ),
+            'orders': compare(
+                OrderSerializer, Order.objects.order_by('-created_at', '-id')[page], context, args.rounds
+            ),
+        }
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    print(report)
+
+
+if __name__ == '__main__':
+    main()
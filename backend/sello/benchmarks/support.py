@@ -0,0 +1,47 @@
+import contextlib
+import logging
+import math
+import os
+import tempfile
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sello.settings')
+    django.setup()
+    logging.disable(logging.CRITICAL)
+
+
+@contextlib.contextmanager
+def benchmark_database():
+    """Create a migrated, throwaway database (a temporary file on SQLite) for the run."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def latency_summary(seconds):
+    """p50/p95/p99/max of a list of durations, in milliseconds."""
+    return {
+        f'p{pct}_ms': round(percentile(seconds, pct) * 1000, 2) if seconds else None
+        for pct in (50, 95, 99)
+    } | {'max_ms': round(max(seconds) * 1000, 2) if seconds else None, 'samples': len(seconds)}
@@ -0,0 +1,59 @@
+import signal
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import claim, run
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue until stopped (SIGINT/SIGTERM).'
+
+    def add_arguments(self, parser):
+        defaults = getattr(settings, 'JOBS', {})
+        parser.add_argument('--concurrency', type=int, default=defaults.get('CONCURRENCY', 4),
+                            help='jobs to run at once, each in its own thread')
+        parser.add_argument('--visibility-timeout', type=float, default=defaults.get('VISIBILITY_TIMEOUT', 300),
+                            help='seconds before a job whose worker went away may be claimed again')
+        parser.add_argument('--poll-interval', type=float, default=defaults.get('POLL_INTERVAL', 1.0),
+                            help='seconds to wait between polls when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='exit once no jobs are due')
+
+    def handle(self, *args, **options):
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopping.set())
+
+        concurrency = options['concurrency']
+        counts = {True: 0, False: 0}
+        running = set()
+        with ThreadPoolExecutor(concurrency, thread_name_prefix='job') as pool:
+            while not stopping.is_set():
+                close_old_connections()
+                jobs = claim(concurrency - len(running), options['visibility_timeout']) if len(running) < concurrency else []
+                running.update(pool.submit(self._run, job) for job in jobs)
+                if not running:
+                    if options['once']:
+                        break
+                    stopping.wait(options['poll_interval'])
+                    continue
+                done, running = wait(running, timeout=0 if jobs else options['poll_interval'],
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    counts[future.result()] += 1
+            # Finish what was claimed rather than leaving it to the visibility timeout.
+            for future in wait(running).done:
+                counts[future.result()] += 1
+
+        self.stdout.write(f'Ran {counts[True] + counts[False]} jobs, {counts[False]} failed.')
+
+    @staticmethod
+    def _run(job):
+        close_old_connections()
+        try:
+            return run(job)
+        finally:
+            close_old_connections()
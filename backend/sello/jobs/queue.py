@@ -0,0 +1,114 @@
+"""
+A durable background job queue kept in the main database.
+
+``enqueue()`` inserts a ``Job`` row, so a job enqueued inside a transaction
+exists exactly when that transaction commits. ``manage.py run_jobs`` claims
+due jobs, calls the handler registered under the job's name with the payload
+as keyword arguments, and deletes the job once the handler returns.
+
+A failing job is retried with exponential backoff until it has made
+``max_attempts`` attempts, then kept as ``FAILED`` for inspection. A claimed
+job is hidden from other workers for ``VISIBILITY_TIMEOUT`` seconds; if its
+worker dies, it becomes claimable again after that. A job can therefore run
+more than once, so handlers must be idempotent.
+"""
+import logging
+import random
+import traceback
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_settings = getattr(settings, 'JOBS', {})
+
+Handler = namedtuple('Handler', ['func', 'max_attempts'])
+handlers = {}
+
+
+def register(name, max_attempts=None):
+    """Decorator registering ``func`` as the handler for jobs called ``name``."""
+
+    def decorator(func):
+        handlers[name] = Handler(func, max_attempts or _settings.get('MAX_ATTEMPTS', 5))
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload=None, delay=0):
+    """Queue a job to run ``delay`` seconds from now; ``payload`` must be JSON-serializable."""
+    if name not in handlers:
+        raise ValueError(f'No handler registered for job {name!r}.')
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=handlers[name].max_attempts,
+    )
+
+
+def claim(limit, visibility_timeout=None):
+    """Claim up to ``limit`` due jobs for this worker and return them."""
+    if visibility_timeout is None:
+        visibility_timeout = _settings.get('VISIBILITY_TIMEOUT', 300)
+    now = timezone.now()
+
+    # A worker died holding these on their last attempt.
+    Job.objects.filter(status='RUNNING', locked_until__lt=now, attempts__gte=F('max_attempts')).update(
+        status='FAILED', claim='', locked_until=None, updated_at=now,
+        last_error='Visibility timeout expired during the last attempt.',
+    )
+
+    due = Q(status='QUEUED', run_at__lte=now) | Q(status='RUNNING', locked_until__lt=now)
+    token = uuid.uuid4().hex
+    # Repeating the conditions in the UPDATE means that of two workers
+    # selecting the same ids, only the first to write gets each job.
+    Job.objects.filter(due, pk__in=Job.objects.filter(due).order_by('run_at', 'id').values('pk')[:limit]).update(
+        status='RUNNING',
+        claim=token,
+        locked_until=now + timedelta(seconds=visibility_timeout),
+        attempts=F('attempts') + 1,
+        updated_at=now,
+    )
+    return list(Job.objects.filter(claim=token).order_by('run_at', 'id'))
+
+
+def run(job):
+    """Run a claimed job; returns whether it succeeded."""
+    handler = handlers.get(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f'No handler registered for job {job.name!r}.')
+        handler.func(**job.payload)
+    except Exception:
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.name, job.attempts)
+        _fail(job, traceback.format_exc())
+        return False
+    # Guarded by the claim, in case the job timed out and was claimed again meanwhile.
+    Job.objects.filter(pk=job.pk, claim=job.claim).delete()
+    return True
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying after ``attempts`` failed attempts, with jitter."""
+    delay = min(_settings.get('BACKOFF_BASE', 5) * 2 ** (attempts - 1), _settings.get('BACKOFF_MAX', 3600))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _fail(job, error):
+    now = timezone.now()
+    if job.attempts >= job.max_attempts:
+        changes = {'status': 'FAILED'}
+    else:
+        changes = {'status': 'QUEUED', 'run_at': now + timedelta(seconds=backoff(job.attempts))}
+    Job.objects.filter(pk=job.pk, claim=job.claim).update(
+        claim='', locked_until=None, last_error=error, updated_at=now, **changes,
+    )
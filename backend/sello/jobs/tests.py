@@ -0,0 +1,100 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from . import queue
+from .models import Job
+
+calls = []
+
+
+@queue.register('tests.record')
+def record(**payload):
+    calls.append(payload)
+
+
+@queue.register('tests.explode', max_attempts=2)
+def explode(**payload):
+    raise RuntimeError('boom')
+
+
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def expire(self, job):
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now(), locked_until=timezone.now() - timedelta(seconds=1))
+
+    def test_claimed_job_runs_once_and_is_deleted(self):
+        job = queue.enqueue('tests.record', {'order_id': 1})
+        [claimed] = queue.claim(10)
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (job.pk, 'RUNNING', 1))
+        self.assertEqual(queue.claim(10), [])
+
+        self.assertTrue(queue.run(claimed))
+        self.assertEqual(calls, [{'order_id': 1}])
+        self.assertFalse(Job.objects.exists())
+
+    def test_delayed_job_is_not_claimed_early(self):
+        queue.enqueue('tests.record', delay=60)
+        self.assertEqual(queue.claim(10), [])
+
+    def test_claims_in_run_at_order_up_to_limit(self):
+        later = queue.enqueue('tests.record', {'n': 2})
+        sooner = queue.enqueue('tests.record', {'n': 1})
+        Job.objects.filter(pk=sooner.pk).update(run_at=later.run_at - timedelta(seconds=1))
+        self.assertEqual([job.pk for job in queue.claim(1)], [sooner.pk])
+        self.assertEqual([job.pk for job in queue.claim(1)], [later.pk])
+
+    def test_unknown_job_name_is_rejected(self):
+        with self.assertRaises(ValueError):
+            queue.enqueue('tests.missing')
+
+    def test_failure_is_retried_with_backoff_then_kept_failed(self):
+        queue.enqueue('tests.explode')
+        [job] = queue.claim(10)
+        with mock.patch.object(queue, 'backoff', return_value=30):
+            self.assertFalse(queue.run(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.claim), ('QUEUED', 1, ''))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=25))
+        self.assertIn('boom', job.last_error)
+        self.assertEqual(queue.claim(10), [])
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        [job] = queue.claim(10)
+        self.assertFalse(queue.run(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('FAILED', 2))
+        self.assertEqual(queue.claim(10), [])
+
+    def test_timed_out_claim_is_reclaimed_and_stale_worker_cannot_finish_it(self):
+        queue.enqueue('tests.record')
+        [stale] = queue.claim(10)
+        self.expire(stale)
+        [fresh] = queue.claim(10)
+        self.assertEqual((fresh.pk, fresh.attempts), (stale.pk, 2))
+
+        # The first worker finishing late must not delete the second worker's claim.
+        self.assertTrue(queue.run(stale))
+        self.assertTrue(Job.objects.filter(pk=fresh.pk, claim=fresh.claim).exists())
+        self.assertTrue(queue.run(fresh))
+        self.assertFalse(Job.objects.exists())
+
+    def test_timeout_on_last_attempt_marks_job_failed(self):
+        queue.enqueue('tests.explode')
+        Job.objects.update(attempts=1)
+        [job] = queue.claim(10)
+        self.expire(job)
+        self.assertEqual(queue.claim(10), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+
+    def test_backoff_grows_and_is_capped(self):
+        delays = [queue.backoff(attempts) for attempts in (1, 2, 3)]
+        self.assertTrue(2.5 <= delays[0] <= 5)
+        self.assertTrue(5 <= delays[1] <= 10)
+        self.assertTrue(10 <= delays[2] <= 20)
+        self.assertLessEqual(queue.backoff(50), 3600)
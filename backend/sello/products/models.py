@@ -12,5 +12,11 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='products_product_created_idx'),
+            models.Index(fields=['shopkeeper', 'created_at', 'id'], name='products_product_owner_idx'),
+        ]
+
     def __str__(self):
         return self.name
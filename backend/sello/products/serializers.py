@@ -1,8 +1,11 @@
 from rest_framework import serializers
 from .models import Product
+from users.images import ImageVariantsField
+from sello.metrics import TimedSerializerMixin
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     image = serializers.ImageField(required=True)
+    image_variants = ImageVariantsField(source='image')
     
     def validate_price(self, value):
         if value <= 0:
@@ -16,5 +19,5 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description', 'price', 'image', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'price', 'image', 'image_variants', 'created_at', 'updated_at']
         read_only_fields = ['shopkeeper', 'created_at', 'updated_at']
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.cache import catalog_cache, product_scopes
+from users.images import register_image_fields
+from .models import Product
+
+register_image_fields(Product, 'image')
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    catalog_cache.bump(*product_scopes(Product, instance.pk, instance.shopkeeper_id))
@@ -1,3 +1,23 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from products.models import Product
+from users.tests.base import APITestCase
+from users.tests.test_streaming import StreamTestMixin
+
+
+class MyProductsStreamingTests(StreamTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        other = self.make_user('other@example.com', role='SHOPKEEPER')
+        for owner in (self.shopkeeper, other):
+            for n in range(5):
+                Product.objects.create(
+                    shopkeeper=owner, name=f'Product {n}', description='d', price='2.00',
+                    image=f'products/{n}.png',
+                )
+
+    def test_my_products_stream_matches_pages(self):
+        chunks = self.assert_streams_like_pages(self.shopkeeper, '/api/products/my_products/')
+        names = [product['name'] for product in json.loads(b''.join(chunks))]
+        self.assertEqual(names, [f'Product {n}' for n in reversed(range(5))])
@@ -4,38 +4,60 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Product
 from .serializers import ProductSerializer
+from users.cache import CatalogCacheMixin, instance_scope, owner_scope, table_scope
+from users.pagination import KeysetPagination
+from users.streaming import StreamingListMixin, wants_stream
+from sello.routers import ReplicaReadsMixin
 import logging
 
 # Create your views here.
 
 logger = logging.getLogger(__name__)
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ReplicaReadsMixin, StreamingListMixin, CatalogCacheMixin, viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    replica_actions = ('list', 'retrieve', 'my_products')
 
     def get_queryset(self):
         if self.action == 'my_products':
             return Product.objects.filter(shopkeeper=self.request.user)
         return Product.objects.all()
 
+    def get_list_cache_scopes(self):
+        return [table_scope(Product)]
+
+    def get_detail_cache_scopes(self, pk):
+        return [instance_scope(Product, pk)]
+
     def perform_create(self, serializer):
-        logger.info(f"Creating product with data: {self.request.data}")
         serializer.save(shopkeeper=self.request.user)
-        logger.info(f"Product created successfully: {serializer.data}")
 
     def create(self, request, *args, **kwargs):
-        logger.info(f"Received product creation request with data: {request.data}")
+        logger.debug("Received product creation request with data: %s", request.data)
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             self.perform_create(serializer)
-            logger.info(f"Product created successfully: {serializer.data}")
+            logger.info("Product %s created by user %s", serializer.instance.pk, request.user.pk)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        logger.error(f"Product creation failed. Errors: {serializer.errors}")
+        logger.error("Product creation failed. Errors: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['get'])
     def my_products(self, request):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        if wants_stream(request):
+            return self.stream_list(self.filter_queryset(self.get_queryset()))
+
+        def build():
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data).data
+
+        data = self.catalog_cache.get_or_set(
+            f'{self.basename}:mine:{request.build_absolute_uri()}',
+            [owner_scope(Product, request.user.pk)],
+            build,
+        )
+        return Response(data)
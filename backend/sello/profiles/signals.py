@@ -0,0 +1,5 @@
+from users.images import register_image_fields
+from .models import CustomerProfile, ShopkeeperProfile
+
+register_image_fields(CustomerProfile, 'profile_picture')
+register_image_fields(ShopkeeperProfile, 'store_logo', 'store_banner')
@@ -1,3 +1,77 @@
-from django.test import TestCase
+from profiles.models import Address, CustomerProfile, ShopkeeperProfile
+from users.tests.base import APITestCase
 
-# Create your tests here.
+
+class ProfileConditionalGetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user('customer@example.com')
+        self.profile = CustomerProfile.objects.create(user=self.user, bio='Hello')
+        self.client = self.client_for(self.user)
+        self.urls = ['/api/customer/', f'/api/customer/{self.profile.pk}/']
+
+    def etags(self):
+        etags = []
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etags.append(response['ETag'])
+        return etags
+
+    def assert_not_modified(self, etags):
+        for url, etag in zip(self.urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def assert_modified(self, etags):
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_unchanged_profile_is_not_modified(self):
+        self.assert_not_modified(self.etags())
+
+    def test_profile_edit(self):
+        etags = self.etags()
+        self.profile.bio = 'Changed'
+        self.profile.save()
+        self.assert_modified(etags)
+
+    def test_address_added_edited_and_removed(self):
+        etags = self.etags()
+        address = Address.objects.create(user=self.user, street_address='1 Main St', city='A', state='B',
+                                         postal_code='1')
+        self.assert_modified(etags)
+
+        etags = self.etags()
+        address.city = 'C'
+        address.save()
+        self.assert_modified(etags)
+
+        etags = self.etags()
+        address.delete()
+        self.assert_modified(etags)
+
+    def test_user_edit(self):
+        etags = self.etags()
+        self.user.first_name = 'Ada'
+        self.user.save()
+        self.assert_modified(etags)
+
+    def test_etag_varies_per_user(self):
+        other = self.make_user('other@example.com')
+        CustomerProfile.objects.create(user=other)
+        etag = self.client.get('/api/customer/')['ETag']
+        self.assertEqual(self.client_for(other).get('/api/customer/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_shopkeeper_profile(self):
+        shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        profile = ShopkeeperProfile.objects.create(user=shopkeeper, store_name='Dairy')
+        client = self.client_for(shopkeeper)
+        url = f'/api/shopkeeper/{profile.pk}/'
+        etag = client.get(url)['ETag']
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        profile.store_name = 'Dairy & Co'
+        profile.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.json()['store_name']), (200, 'Dairy & Co'))
@@ -6,9 +6,31 @@ from django.shortcuts import get_object_or_404
 from .models import Address, CustomerProfile, ShopkeeperProfile
 from .serializers import AddressSerializer, CustomerProfileSerializer, ShopkeeperProfileSerializer
 from rest_framework.exceptions import ValidationError
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max
+from users.authentication import principal_cache
+from users.cache import instance_scope
+from users.conditional import ConditionalGetMixin
 
 # Create your views here.
 
+class ProfileConditionalGetMixin(ConditionalGetMixin):
+    """
+    Validate a profile from its own and its owner's addresses' ``updated_at``
+    (one aggregate query) plus the owner's principal cache stamp, which
+    changes whenever the user row is saved.
+    """
+    profile_relation = None
+
+    def get_etag_parts(self):
+        user = self.request.user
+        summary = get_user_model().objects.filter(pk=user.pk).aggregate(
+            profile=Max(f'{self.profile_relation}__updated_at'),
+            addresses=Max('address__updated_at'),
+            address_count=Count('address', distinct=True),
+        )
+        return [*summary.values(), *principal_cache.get_versions([instance_scope(get_user_model(), user.pk)])]
+
 class AddressViewSet(viewsets.ModelViewSet):
     serializer_class = AddressSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -29,9 +51,10 @@ class AddressViewSet(viewsets.ModelViewSet):
         address.save()
         return Response({'status': 'Default address set'})
 
-class CustomerProfileViewSet(viewsets.ModelViewSet):
+class CustomerProfileViewSet(ProfileConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CustomerProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    profile_relation = 'customer_profile'
 
     def get_queryset(self):
         if getattr(self.request.user, 'customer_profile', None):
@@ -54,9 +77,10 @@ class CustomerProfileViewSet(viewsets.ModelViewSet):
         profile.save()
         return Response({'status': 'Profile picture updated'})
 
-class ShopkeeperProfileViewSet(viewsets.ModelViewSet):
+class ShopkeeperProfileViewSet(ProfileConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = ShopkeeperProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
+    profile_relation = 'shopkeeper_profile'
 
     def get_queryset(self):
         if getattr(self.request.user, 'shopkeeper_profile', None):
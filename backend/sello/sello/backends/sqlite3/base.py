@@ -0,0 +1,34 @@
+"""
+SQLite backend tuned for a multi-threaded web server.
+
+Stock ``django.db.backends.sqlite3`` plus two ``OPTIONS`` Django 5.0 does
+not have:
+
+* ``pragmas``: ``{name: value}`` run on every new connection, e.g. WAL
+  journaling, ``synchronous=NORMAL``, ``mmap_size``, ``cache_size`` and
+  ``busy_timeout``.
+* ``transaction_mode``: how ``atomic()`` blocks begin. ``IMMEDIATE`` takes
+  the write lock up front, so a transaction that reads and then writes waits
+  for the busy timeout instead of failing at once with "database is locked"
+  when another writer got there first (same meaning as the option Django
+  5.1 added).
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop('pragmas', None)
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
@@ -0,0 +1,170 @@
+"""
+Non-blocking, structured logging.
+
+``QueueHandler`` only puts the record on a bounded in-memory queue; a
+background thread formats it and writes it out. Formatting and the write
+syscall therefore happen off the request thread. ``%``-style arguments
+are also merged there, so pass them lazily (``logger.info("x %s", y)``)
+and pass values that will not change afterwards. When the queue is full,
+records are dropped and counted rather than blocking the request; the
+count is exported by ``/metrics`` (``metrics_collector``).
+
+``JSONFormatter`` writes one JSON object per line. It includes any
+``extra=`` fields, and it redacts values under sensitive keys
+(``SENSITIVE_KEYS``) in both the arguments and the extras, so logging
+``request.data`` never writes a password out. ``SamplingFilter`` keeps
+only a fraction of the DEBUG/INFO records from chosen loggers
+(``LOG_SAMPLING`` in settings); warnings and errors are always kept.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import weakref
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler as BaseQueueHandler, QueueListener
+
+SENSITIVE_KEYS = re.compile(r'pass|secret|token|refresh|access|authorization|cookie|session|card|cvv', re.I)
+REDACTED = '[redacted]'
+
+# Attributes every LogRecord has; anything else came from ``extra=``.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_traceback_formatter = logging.Formatter()
+
+_queue_handlers = weakref.WeakSet()
+
+
+def redact(value):
+    """A copy of ``value`` with every sensitive key's value replaced, at any depth."""
+    if isinstance(value, Mapping):
+        return {
+            key: REDACTED if isinstance(key, str) and SENSITIVE_KEYS.search(key) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(item) for item in value)
+    return value
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        # LogRecord.getMessage(), on redacted arguments.
+        message = str(record.msg)
+        if record.args:
+            message = message % redact(record.args)
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': message,
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and not name.startswith('_'):
+                entry[name] = REDACTED if SENSITIVE_KEYS.search(name) else redact(value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep each record below WARNING with the probability configured for the
+    closest logger in ``rates`` (``{'users.views': 0.1}``); unlisted loggers
+    keep everything.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self._resolved = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._resolved.get(record.name)
+        if rate is None:
+            rate = self._resolved[record.name] = self._rate_for(record.name)
+        return rate >= 1 or random.random() < rate
+
+    def _rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return self.rates.get('', 1.0)
+
+
+class QueueHandler(BaseQueueHandler):
+    """
+    Hand records to a background thread that writes them to ``stream``
+    (stderr by default). The formatter set on this handler is the one the
+    thread uses.
+    """
+
+    def __init__(self, stream=None, max_size=10000):
+        super().__init__(queue.SimpleQueue())
+        self.max_size = max_size
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.listener = None
+        _queue_handlers.add(self)
+        self._start()
+        atexit.register(self.stop)
+        # A forked worker (gunicorn --preload) does not inherit the thread.
+        os.register_at_fork(after_in_child=self._start)
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Unlike the stdlib handler, leave formatting to the listener thread;
+        # only render a traceback now, so its frames are not kept alive.
+        if record.exc_info:
+            record = copy.copy(record)
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.max_size:
+            with self._dropped_lock:
+                self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _start(self):
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+
+def metrics_collector():
+    """A ``sello.metrics`` collector exporting how many records each ``QueueHandler`` dropped."""
+
+    def collect():
+        return [
+            ('sello_log_records_dropped_total', 'counter', 'Log records dropped because the log queue was full.',
+             {'handler': handler.name or ''}, handler.dropped)
+            for handler in list(_queue_handlers)
+        ]
+
+    return collect
@@ -0,0 +1,306 @@
+"""
+In-process request metrics with a Prometheus text exposition.
+
+``PerformanceMiddleware`` (sello/middleware.py) feeds per-view histograms
+here. Each worker process keeps its own registry; when
+``METRICS_SPOOL_DIR`` is set, workers also write a snapshot of it to
+``<dir>/<pid>.json`` at most every ``METRICS_SPOOL_INTERVAL`` seconds, and
+``/metrics`` sums the snapshots of every worker still running so one
+scrape sees the whole server; snapshots left by exited workers are deleted.
+Everything is plain counters behind a lock, cheap enough to leave on all the
+time.
+
+``/metrics`` requires ``METRICS_TOKEN`` as a bearer token; without one it
+is only served when ``DEBUG`` is on.
+"""
+import bisect
+import contextvars
+import glob
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from . import log
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+LOOKUP_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+
+METRICS = {
+    'sello_request_duration_seconds': ('histogram', 'Total time spent in the view stack.', DURATION_BUCKETS),
+    'sello_db_duration_seconds': ('histogram', 'Time spent executing SQL per request.', DURATION_BUCKETS),
+    'sello_db_queries': ('histogram', 'SQL queries executed per request.', QUERY_BUCKETS),
+    'sello_serializer_duration_seconds': ('histogram', 'Time spent serializing per request.', DURATION_BUCKETS),
+    'sello_requests_total': ('counter', 'Requests handled, by status code.', None),
+    'sello_token_blacklist_lookup_seconds': (
+        'histogram', 'Refresh-token blacklist checks, by how they were answered.', LOOKUP_BUCKETS,
+    ),
+}
+
+
+class Registry:
+    """Histograms and counters keyed by ``(metric, labels)``; ``labels`` is a sorted tuple of pairs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, metric, labels, value):
+        buckets = METRICS[metric][2]
+        with self._lock:
+            key = (metric, labels)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            histogram[0][bisect.bisect_left(buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def increment(self, metric, labels, amount=1):
+        with self._lock:
+            key = (metric, labels)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'histograms': [
+                    [metric, list(labels), list(counts), total, count]
+                    for (metric, labels), (counts, total, count) in self._histograms.items()
+                ],
+                'counters': [[metric, list(labels), value] for (metric, labels), value in self._counters.items()],
+            }
+
+
+registry = Registry()
+_collectors = []
+_last_spool = 0.0
+
+
+def register_collector(collector):
+    """
+    Add a callable returning ``[(metric, type, help, labels, value), ...]``
+    read at scrape (and spool) time, e.g. cache hit counters.
+    """
+    _collectors.append(collector)
+
+
+def collect():
+    samples = []
+    for collector in _collectors:
+        samples.extend([metric, kind, help_text, sorted(labels.items()), value]
+                       for metric, kind, help_text, labels, value in collector())
+    return samples
+
+
+register_collector(log.metrics_collector())
+
+
+# Per-request timings ---------------------------------------------------------
+
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    __slots__ = ('db_time', 'db_queries', 'serializer_time', 'serializer_depth')
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+
+def start_request():
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def end_request(token):
+    _current_timings.reset(token)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request's timings."""
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_time += time.perf_counter() - started
+        timings.db_queries += 1
+
+
+def install_query_timer(connection, **kwargs):
+    """``connection_created`` receiver; the wrapper stays for the connection's lifetime."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+@contextmanager
+def serializer_timer():
+    """Add the enclosed time to the current request's serializer time; nested uses count once."""
+    timings = _current_timings.get()
+    if timings is None or timings.serializer_depth:
+        yield
+        return
+    timings.serializer_depth = 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serializer_time += time.perf_counter() - started
+        timings.serializer_depth = 0
+
+
+class TimedSerializerMixin:
+    """Count a serializer's ``to_representation`` towards the request's serializer time."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+# Recording and spooling -----------------------------------------------------
+
+def record(view, method, status_code, duration, timings):
+    labels = (('method', method), ('view', view))
+    registry.observe('sello_request_duration_seconds', labels, duration)
+    registry.observe('sello_db_duration_seconds', labels, timings.db_time)
+    registry.observe('sello_db_queries', labels, timings.db_queries)
+    registry.observe('sello_serializer_duration_seconds', labels, timings.serializer_time)
+    registry.increment('sello_requests_total', labels + (('status', str(status_code)),))
+    maybe_spool()
+
+
+def get_spool_dir():
+    return getattr(settings, 'METRICS_SPOOL_DIR', None)
+
+
+def maybe_spool(force=False):
+    global _last_spool
+    directory = get_spool_dir()
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_spool < getattr(settings, 'METRICS_SPOOL_INTERVAL', 5):
+        return
+    _last_spool = now
+    snapshot = registry.snapshot() | {'collected': collect()}
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(path, os.path.join(directory, f'{os.getpid()}.json'))
+
+
+def load_snapshots():
+    """This process's live snapshot plus every other worker's spooled one."""
+    snapshots = [registry.snapshot() | {'collected': collect()}]
+    directory = get_spool_dir()
+    if directory:
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            pid = os.path.splitext(os.path.basename(path))[0]
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            if not _process_alive(int(pid)):
+                # Its counters went with it; summing them would count them forever.
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return snapshots
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user.
+        return True
+    return True
+
+
+# Exposition -----------------------------------------------------------------
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join('{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+                     for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def render(snapshots):
+    histograms, counters, collected, descriptions = {}, {}, {}, {}
+    for snapshot in snapshots:
+        for metric, labels, counts, total, count in snapshot['histograms']:
+            key = (metric, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+            merged[2] += count
+        for metric, labels, value in snapshot['counters']:
+            key = (metric, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for metric, kind, help_text, labels, value in snapshot.get('collected', ()):
+            descriptions[metric] = (kind, help_text)
+            key = (metric, tuple(map(tuple, labels)))
+            collected[key] = collected.get(key, 0) + value
+
+    lines = []
+    for metric, (kind, help_text, buckets) in METRICS.items():
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        if kind == 'histogram':
+            for (name, labels), (counts, total, count) in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + ('+Inf',), counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{metric}_sum{_format_labels(labels)} {total}')
+                lines.append(f'{metric}_count{_format_labels(labels)} {count}')
+        else:
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f'{metric}{_format_labels(labels)} {value}')
+
+    for metric, (kind, help_text) in sorted(descriptions.items()):
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        for (name, labels), value in sorted(collected.items()):
+            if name == metric:
+                lines.append(f'{metric}{_format_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires ``Authorization: Bearer
+    <METRICS_TOKEN>``; with no token configured it is open only under ``DEBUG``.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(render(load_snapshots()), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,107 @@
+"""
+Read/write splitting across the primary and read replicas.
+
+Nothing reads from a replica by default. Code that is safe to serve from a
+slightly stale copy opts in with ``replica_reads()`` (a decorator or context
+manager); views do it through ``ReplicaReadsMixin``. Inside that scope
+reads go to one replica chosen for the whole scope, except that:
+
+* every write goes to ``default`` and pins the rest of the scope to it, so a
+  request reads its own writes;
+* reads inside a transaction on ``default`` stay there.
+
+Replica aliases come from ``REPLICA_DATABASES`` (see ``DB_REPLICAS`` in
+settings). Catalog cache entries computed from a lagging replica live until
+the next invalidation or ``CATALOG_CACHE['TIMEOUT']``, so keep that below the
+staleness you can accept.
+"""
+import contextvars
+import random
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_scope = contextvars.ContextVar('replica_scope', default=None)
+
+
+class _ReplicaScope:
+    __slots__ = ('alias', 'pinned')
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.pinned = False
+
+
+def get_replicas():
+    return list(getattr(settings, 'REPLICA_DATABASES', ()))
+
+
+class replica_reads(ContextDecorator):
+    """Send reads in this scope to a replica until the first write."""
+
+    def __enter__(self):
+        replicas = get_replicas()
+        current = _scope.get()
+        if current is not None:
+            # Nested scopes share the outer one (and its pin).
+            self._token = _scope.set(current)
+        else:
+            self._token = _scope.set(_ReplicaScope(random.choice(replicas) if replicas else None))
+        return self
+
+    def __exit__(self, *exc_info):
+        _scope.reset(self._token)
+        return False
+
+    def _recreate_cm(self):
+        # As a decorator, one instance wraps every call; give each call its
+        # own so concurrent requests do not share ``_token``.
+        return type(self)()
+
+
+def pin_to_primary():
+    """Read from the primary for the rest of the current scope."""
+    scope = _scope.get()
+    if scope is not None:
+        scope.pinned = True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        scope = _scope.get()
+        if scope is None or scope.pinned or scope.alias is None:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return scope.alias
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
+
+
+class ReplicaReadsMixin:
+    """
+    Serve safe requests for the actions in ``replica_actions`` inside
+    ``replica_reads()``.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        action = getattr(self, 'action_map', {}).get(request.method.lower())
+        if request.method in ('GET', 'HEAD', 'OPTIONS') and action in self.replica_actions:
+            with replica_reads():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
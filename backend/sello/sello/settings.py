@@ -36,9 +36,11 @@ INSTALLED_APPS = [
     'users',
     'profiles',
     'products',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'sello.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -70,13 +72,110 @@ TEMPLATES = [
 WSGI_APPLICATION = 'sello.wsgi.application'
 
 # Database
-DATABASES = {
+# DB_PROFILE picks one of:
+#   sqlite       (default) SQLite in WAL mode with tuned pragmas, IMMEDIATE
+#                transactions and a busy timeout (sello/backends/sqlite3).
+#   sqlite-basic Django's stock SQLite settings.
+#   postgresql   A server database with persistent, health-checked connections;
+#                put PgBouncer in front (DB_PGBOUNCER=true) for pooling.
+DB_PROFILE = os.getenv('DB_PROFILE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 600))
+
+if DB_PROFILE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'sello'),
+            'USER': os.getenv('DB_USER', 'sello'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # Transaction-mode PgBouncer can't keep server-side cursors open.
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_PGBOUNCER', 'false').lower() == 'true',
+            'OPTIONS': {
+                'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+                'options': f"-c statement_timeout={int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))}",
+            },
+        }
+    }
+elif DB_PROFILE == 'sqlite-basic':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+else:
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 20000))
+    DATABASES = {
+        'default': {
+            'ENGINE': 'sello.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+                    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+                    # Negative means KiB rather than pages.
+                    'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024)),
+                    'temp_store': 'MEMORY',
+                },
+            },
+        }
+    }
+
+# Read replicas: DB_REPLICAS is a comma-separated list of replica hosts
+# (postgresql) or database files (sqlite; refresh them from the primary with
+# `manage.py sync_replicas`). They become aliases replica1, replica2, ... and
+# sello.routers.ReplicaRouter sends opted-in reads to them.
+DB_REPLICAS = [replica.strip() for replica in os.getenv('DB_REPLICAS', '').split(',') if replica.strip()]
+REPLICA_DATABASES = []
+for number, replica in enumerate(DB_REPLICAS, start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST' if DB_PROFILE == 'postgresql' else 'NAME': replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+DATABASE_ROUTERS = ['sello.routers.ReplicaRouter']
+
+# Cache
+# Defaults to a per-process cache; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared backend (e.g. django.core.cache.backends.redis.RedisCache) when
+# running more than one worker.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'sello'),
+        'TIMEOUT': 300,
     }
 }
 
+# Product catalog cache (users/cache.py)
+CATALOG_CACHE = {
+    'LOCAL_MAX_ENTRIES': int(os.getenv('CATALOG_CACHE_LOCAL_MAX_ENTRIES', 1024)),
+    'LOCAL_TTL': int(os.getenv('CATALOG_CACHE_LOCAL_TTL', 30)),
+    'TIMEOUT': int(os.getenv('CATALOG_CACHE_TIMEOUT', 300)),
+}
+
+# Per-user dashboard cache (users/dashboard.py)
+DASHBOARD_CACHE = {
+    'LOCAL_MAX_ENTRIES': int(os.getenv('DASHBOARD_CACHE_LOCAL_MAX_ENTRIES', 1024)),
+    'LOCAL_TTL': int(os.getenv('DASHBOARD_CACHE_LOCAL_TTL', 30)),
+    'TIMEOUT': int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 300)),
+}
+
+# How long checkout holds stock for a customer (users/reservations.py).
+STOCK_RESERVATION_TTL = int(os.getenv('STOCK_RESERVATION_TTL', 600))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -93,6 +192,22 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. PASSWORD_HASH_ITERATIONS tunes the PBKDF2 work factor;
+# stored hashes are upgraded to it on the next login.
+PASSWORD_HASHERS = [
+    'users.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', 0)) or None
+
+# Serve signin/signup with the async views in users/async_views.py, which
+# hash passwords in a pool of PASSWORD_HASHING_WORKERS threads.
+ASYNC_AUTH_VIEWS = os.getenv('ASYNC_AUTH_VIEWS', 'true').lower() == 'true'
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', 0)) or None
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -104,6 +219,13 @@ STATIC_URL = 'static/'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Resized copies generated for uploaded images (users/images.py)
+IMAGE_VARIANTS = {
+    'thumb': {'size': (200, 200), 'format': 'WEBP', 'quality': 80},
+    'medium': {'size': (800, 800), 'format': 'WEBP', 'quality': 80},
+}
+IMAGE_VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', 2))
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -143,7 +265,7 @@ CORS_ALLOW_HEADERS = [
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -176,18 +298,72 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
-# Logging configuration
+# Refresh-token blacklist filter (users/blacklist.py). Expired tokens are
+# removed with `manage.py purge_tokens --interval 3600`.
+TOKEN_BLACKLIST = {
+    'FILTER_CAPACITY': int(os.getenv('TOKEN_BLACKLIST_FILTER_CAPACITY', 100_000)),
+    'FILTER_ERROR_RATE': float(os.getenv('TOKEN_BLACKLIST_FILTER_ERROR_RATE', 0.001)),
+    'SYNC_INTERVAL': float(os.getenv('TOKEN_BLACKLIST_SYNC_INTERVAL', 1.0)),
+    # Full reload, catching rows committed out of id order (see users/blacklist.py).
+    'REBUILD_INTERVAL': float(os.getenv('TOKEN_BLACKLIST_REBUILD_INTERVAL', 300)),
+}
+
+# Background job queue (jobs/queue.py), worked by `manage.py run_jobs`.
+JOBS = {
+    'CONCURRENCY': int(os.getenv('JOBS_CONCURRENCY', 4)),
+    'VISIBILITY_TIMEOUT': int(os.getenv('JOBS_VISIBILITY_TIMEOUT', 300)),
+    'POLL_INTERVAL': float(os.getenv('JOBS_POLL_INTERVAL', 1.0)),
+    'MAX_ATTEMPTS': int(os.getenv('JOBS_MAX_ATTEMPTS', 5)),
+    'BACKOFF_BASE': int(os.getenv('JOBS_BACKOFF_BASE', 5)),
+    'BACKOFF_MAX': int(os.getenv('JOBS_BACKOFF_MAX', 3600)),
+}
+
+# How long an authenticated user may be served from the principal cache
+# (users/authentication.py) before it is re-read from the database.
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+
+# Request instrumentation (sello/middleware.py, sello/metrics.py). Set
+# METRICS_SPOOL_DIR to a directory shared by the workers of one host so that
+# /metrics reports all of them. /metrics requires METRICS_TOKEN as a bearer
+# token; without one it is only served when DEBUG is on.
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'true').lower() == 'true'
+METRICS_SPOOL_DIR = os.getenv('METRICS_SPOOL_DIR') or None
+METRICS_SPOOL_INTERVAL = float(os.getenv('METRICS_SPOOL_INTERVAL', 5))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+
+# Logging configuration. Records are written as JSON lines by a background
+# thread (sello/log.py). LOG_SAMPLING keeps only a fraction of DEBUG/INFO
+# records from busy loggers, e.g. LOG_SAMPLING="users.views=0.1,products.views=0.5".
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_SAMPLING = {
+    name: float(rate)
+    for name, _, rate in (item.partition('=') for item in os.getenv('LOG_SAMPLING', '').split(',') if item)
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'sello.log.JSONFormatter',
+        },
+    },
+    'filters': {
+        'sampling': {
+            '()': 'sello.log.SamplingFilter',
+            'rates': LOG_SAMPLING,
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            'class': 'sello.log.QueueHandler',
+            'formatter': 'json',
+            'filters': ['sampling'],
         },
     },
     'root': {
         'handlers': ['console'],
-        'level': 'INFO',
+        'level': LOG_LEVEL,
     },
     'loggers': {
         'django': {
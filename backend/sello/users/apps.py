@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from sello.metrics import register_collector
+
+        from . import signals  # noqa: F401
+        from . import blacklist
+        from .authentication import principal_cache
+        from .cache import catalog_cache, metrics_collector
+        from .dashboard import dashboard_cache
+
+        register_collector(metrics_collector(catalog_cache, principal_cache, dashboard_cache))
+        register_collector(blacklist.metrics_collector())
@@ -0,0 +1,115 @@
+"""
+Async versions of the sign-in and sign-up endpoints.
+
+They behave like ``SignInView`` / ``SignUpView`` but hash passwords in the
+bounded pool from ``users.passwords``, so they don't hold a request worker
+for the duration of PBKDF2. Enabled with ``ASYNC_AUTH_VIEWS``; serve the
+project through ``sello.asgi`` to benefit.
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+
+from .blacklist import RefreshToken
+from .models import User
+from .passwords import amake_password, averify_password
+from .serializers import CredentialsSerializer, UserSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def parse_body(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST.dict()
+
+
+def issue_tokens(user):
+    refresh = RefreshToken.for_user(user)
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+
+def invalid_body_response():
+    return JsonResponse({'detail': 'JSON parse error.'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@csrf_exempt
+@require_POST
+async def sign_in(request):
+    data = parse_body(request)
+    if data is None:
+        return invalid_body_response()
+
+    serializer = CredentialsSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    email = serializer.validated_data['email'].lower()
+    password = serializer.validated_data['password']
+
+    user = await User.objects.filter(email=email).afirst()
+    if user is None:
+        # Hash anyway so unknown emails take as long as wrong passwords.
+        await amake_password(password)
+        is_correct = False
+    else:
+        is_correct, new_encoded = await averify_password(password, user.password)
+        if new_encoded:
+            user.password = new_encoded
+            await user.asave(update_fields=['password'])
+
+    if not is_correct or not user.is_active:
+        logger.error("Async login failed for %s", email)
+        return JsonResponse(
+            {'non_field_errors': ['Invalid email or password.']},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    response_data = await sync_to_async(issue_tokens)(user)
+    response_data['user'] = UserSerializer(user).data
+    logger.info("Login successful for user: %s", user.email)
+    return JsonResponse(response_data)
+
+
+@csrf_exempt
+@require_POST
+async def sign_up(request):
+    data = parse_body(request)
+    if data is None:
+        return invalid_body_response()
+
+    serializer = UserSerializer(data=data)
+    # Field validation checks email uniqueness against the database.
+    if not await sync_to_async(serializer.is_valid)():
+        logger.error("Registration validation failed: %s", serializer.errors)
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        validated_data = serializer.validated_data
+        encoded = await amake_password(validated_data['password'])
+        user = await User.objects.acreate(
+            email=User.objects.normalize_email(validated_data['email'].lower()),
+            password=encoded,
+            first_name=validated_data['first_name'],
+            last_name=validated_data['last_name'],
+            phone=validated_data.get('phone', ''),
+            role=validated_data.get('role', 'CUSTOMER'),
+        )
+        response_data = await sync_to_async(issue_tokens)(user)
+    except Exception as e:
+        logger.error("Registration error: %s", e)
+        return JsonResponse(
+            {'error': 'Registration failed. Please try again.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    response_data['user'] = UserSerializer(user).data
+    logger.info("Registration successful for user: %s", user.email)
+    return JsonResponse(response_data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,62 @@
+import copy
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import VersionedCache, instance_scope
+
+principal_cache = VersionedCache(
+    'principal',
+    local_size=getattr(settings, 'AUTH_USER_CACHE_MAX_ENTRIES', 4096),
+    local_ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+    timeout=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that resolves the token's user from ``principal_cache``
+    instead of querying ``users.User`` on every request.
+
+    Cached users are keyed by id and the user's version stamp, which
+    ``users.signals`` bumps whenever the user row is saved or deleted, so a
+    role change, deactivation or password change takes effect on the next
+    request; the short TTL bounds anything written behind the ORM's back.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cached = principal_cache.get_or_set(
+            f'user:{user_id}',
+            [instance_scope(self.user_model, user_id)],
+            lambda: self._load_user(user_id),
+        )
+        # Callers may cache relations on request.user; never hand out the shared instance.
+        user = copy.copy(cached)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+    def _load_user(self, user_id):
+        try:
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
@@ -0,0 +1,246 @@
+"""
+Refresh-token blacklist checks that do not hit the database.
+
+With ``ROTATE_REFRESH_TOKENS`` and ``BLACKLIST_AFTER_ROTATION`` every refresh
+blacklists the old token, and simplejwt answers "is this token blacklisted?"
+with a join over ``OutstandingToken``/``BlacklistedToken`` on every refresh.
+``token_blacklist`` keeps a Bloom filter of blacklisted JTIs in each process
+instead: a token the filter has never seen is known not to be blacklisted
+without a query, and only the rare filter hit (a replayed token, or a false
+positive at ``FILTER_ERROR_RATE``) is confirmed against the table.
+
+Processes stay in sync through two counters in the shared cache: every
+blacklisting bumps ``generation``, after which readers load the rows added
+since their last load; ``purge_tokens`` bumps ``epoch``, after which readers
+rebuild the filter from scratch so purged JTIs stop taking up room.
+
+The counters only reach other processes through a shared cache backend.
+With the default process-local ``LocMemCache`` each worker sees only its
+own counters: it picks up other workers' blacklistings by reloading every
+``TOKEN_BLACKLIST['SYNC_INTERVAL']`` seconds, and purges at its next
+periodic rebuild (below).
+
+Incremental loads follow the row id, which is assigned at insert, not at
+commit. A row whose transaction committed after rows with higher ids may be
+skipped by them, so every process also rebuilds its filter from the table
+every ``TOKEN_BLACKLIST['REBUILD_INTERVAL']`` seconds. That bounds how long
+such a token can still be accepted.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Max
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import serializers, tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from sello.metrics import registry
+
+_settings = getattr(settings, 'TOKEN_BLACKLIST', {})
+
+# Re-read this many ids below the last one loaded, so rows committed
+# slightly out of id order are usually caught before the next rebuild.
+RELOAD_OVERLAP = 100
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings, sized for ``capacity`` items at ``error_rate``."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """Add ``item``; returns False (and leaves ``count`` alone) if it was already present."""
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        self.count += added
+        return added
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenBlacklist:
+    def __init__(self, capacity=100_000, error_rate=0.001, sync_interval=1.0, rebuild_interval=300.0,
+                 alias='default'):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._counters = None
+        self._synced_at = 0.0
+        self._rebuilt_at = 0.0
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def contains(self, jti):
+        """Whether ``jti`` is blacklisted; answered from the filter unless the filter has seen it."""
+        started = time.perf_counter()
+        self.sync()
+        if jti not in self._filter:
+            result = 'filtered'
+            blacklisted = False
+        else:
+            blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+            result = 'blacklisted' if blacklisted else 'false_positive'
+        registry.observe('sello_token_blacklist_lookup_seconds', (('result', result),),
+                         time.perf_counter() - started)
+        return blacklisted
+
+    def add(self, jti):
+        """Record a newly blacklisted ``jti`` here now and everywhere once it is committed."""
+        self.sync()
+        self._filter.add(jti)
+        transaction.on_commit(self._added)
+
+    def invalidate(self):
+        """Make every process rebuild its filter, e.g. after purging expired tokens."""
+        self._incr('epoch')
+        self._synced_at = 0.0
+
+    def _added(self):
+        generation = self._incr('generation')
+        counters = self._counters
+        if counters is not None and generation == counters['generation'] + 1:
+            # Nobody else wrote in between; the filter already has our own JTI.
+            self._counters = counters | {'generation': generation}
+
+    def sync(self):
+        counters = self._read_counters()
+        if (self._filter is not None and counters == self._counters
+                and time.monotonic() - self._synced_at < self.sync_interval):
+            return
+        with self._lock:
+            if (self._filter is None or counters['epoch'] != (self._counters or {}).get('epoch')
+                    or time.monotonic() - self._rebuilt_at >= self.rebuild_interval):
+                self._rebuild()
+            else:
+                self._load(self._filter, self._last_id - RELOAD_OVERLAP)
+                if self._filter.count > self._filter.capacity:
+                    self._rebuild()
+            self._counters = counters
+            self._synced_at = time.monotonic()
+
+    def stats(self):
+        current = self._filter
+        return {
+            'entries': current.count if current is not None else 0,
+            'capacity': current.capacity if current is not None else 0,
+            'bytes': len(current.bits) if current is not None else 0,
+        }
+
+    def _rebuild(self):
+        # The highest id bounds the row count without counting the table; leave
+        # room for growth so incremental loads do not push the error rate up.
+        last_id = BlacklistedToken.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        capacity = max(self.capacity, 2 * last_id)
+        new_filter = BloomFilter(capacity, self.error_rate)
+        self._last_id = 0
+        self._load(new_filter, 0)
+        self._filter = new_filter
+        self._rebuilt_at = time.monotonic()
+
+    def _load(self, bloom, after_id):
+        rows = (BlacklistedToken.objects.filter(id__gt=after_id).order_by('id')
+                .values_list('id', 'token__jti').iterator(chunk_size=5000))
+        for pk, jti in rows:
+            bloom.add(jti)
+            self._last_id = max(self._last_id, pk)
+
+    def _read_counters(self):
+        keys = {name: f'token_blacklist:{name}' for name in ('generation', 'epoch')}
+        values = self.shared.get_many(keys.values())
+        return {name: values.get(key, 0) for name, key in keys.items()}
+
+    def _incr(self, name):
+        key = f'token_blacklist:{name}'
+        self.shared.add(key, 0, timeout=None)
+        try:
+            return self.shared.incr(key)
+        except ValueError:
+            # Evicted between add() and incr(); any new value tells readers to reload.
+            value = time.time_ns()
+            self.shared.set(key, value, timeout=None)
+            return value
+
+
+token_blacklist = TokenBlacklist(
+    capacity=_settings.get('FILTER_CAPACITY', 100_000),
+    error_rate=_settings.get('FILTER_ERROR_RATE', 0.001),
+    sync_interval=_settings.get('SYNC_INTERVAL', 1.0),
+    rebuild_interval=_settings.get('REBUILD_INTERVAL', 300.0),
+)
+
+
+class RefreshToken(tokens.RefreshToken):
+    """simplejwt's refresh token, checked against ``token_blacklist``."""
+
+    def check_blacklist(self):
+        if token_blacklist.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        blacklisted, created = super().blacklist()
+        if created:
+            token_blacklist.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted, created
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+
+def metrics_collector(table_ttl=60):
+    """
+    A ``sello.metrics`` collector for the filter and the token tables. Row
+    counts are cached for ``table_ttl`` seconds so scrapes do not count the
+    tables every time.
+    """
+    table_counts = {}
+
+    def collect():
+        if table_counts.get('expires', 0) < time.monotonic():
+            table_counts.update(
+                outstanding=OutstandingToken.objects.count(),
+                blacklisted=BlacklistedToken.objects.count(),
+                expires=time.monotonic() + table_ttl,
+            )
+        stats = token_blacklist.stats()
+        samples = [
+            ('sello_token_table_rows', 'gauge', 'Rows in the simplejwt token tables.', {'table': table}, table_counts[table])
+            for table in ('outstanding', 'blacklisted')
+        ]
+        samples += [
+            ('sello_token_blacklist_filter_entries', 'gauge', 'JTIs added to the blacklist filter.', {}, stats['entries']),
+            ('sello_token_blacklist_filter_bytes', 'gauge', 'Size of the blacklist filter bit array.', {}, stats['bytes']),
+        ]
+        return samples
+
+    return collect
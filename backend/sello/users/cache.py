@@ -0,0 +1,289 @@
+"""
+Two-level catalog cache.
+
+Reads go through a small per-process LRU first and the shared Django cache
+(``CACHES['default']``) second. Entries are keyed by the version stamps of
+the scopes they depend on (a product, a shopkeeper's catalog, a whole
+table); writes bump those stamps from model signals, so a changed row can
+never be served from either level.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+
+class LRUCache:
+    """A thread-safe, size-bounded LRU whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_size=1024, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class VersionedCache:
+    """
+    An in-process LRU in front of a shared cache, invalidated by version stamps.
+
+    ``get_or_set(key, scopes, compute)`` stores ``compute()`` under ``key``
+    combined with the current stamp of every scope; ``bump(*scopes)`` drops
+    the stamps so the next read picks fresh ones. Stamps start from
+    ``time.time_ns()`` so a restarted or evicted stamp never repeats.
+
+    With ``single_flight``, concurrent misses on one entry call ``compute()``
+    once: the other callers, in this process or another, wait for its value
+    (see ``_compute_once``).
+    """
+
+    def __init__(self, namespace, local_size=1024, local_ttl=30, timeout=300, alias='default',
+                 single_flight=False, lease_timeout=30, lease_poll=0.05):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.alias = alias
+        self.local = LRUCache(local_size, local_ttl)
+        self.single_flight = single_flight
+        self.lease_timeout = lease_timeout
+        self.lease_poll = lease_poll
+        # Per-key [lock, waiters] for single-flight misses.
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self._counts = {'local_hits': 0, 'shared_hits': 0, 'coalesced': 0, 'misses': 0}
+        self._counts_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def get_versions(self, scopes):
+        keys = [self._version_key(scope) for scope in scopes]
+        versions = self.shared.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                version = time.time_ns()
+                if not self.shared.add(key, version, timeout=None):
+                    version = self.shared.get(key, version)
+                versions[key] = version
+        return [versions[key] for key in keys]
+
+    def bump(self, *scopes):
+        """Invalidate ``scopes`` now and again once the current transaction commits."""
+        keys = [self._version_key(scope) for scope in scopes]
+        if not keys:
+            return
+        self.shared.delete_many(keys)
+        transaction.on_commit(lambda: self.shared.delete_many(keys))
+
+    def get_or_set(self, key, scopes, compute):
+        full_key = self._entry_key(key, scopes)
+
+        value = self.local.get(full_key)
+        if value is not None:
+            self._count('local_hits')
+            return value
+
+        value = self.shared.get(full_key)
+        if value is not None:
+            self._count('shared_hits')
+        elif self.single_flight:
+            value = self._compute_once(full_key, compute)
+        else:
+            self._count('misses')
+            value = compute()
+            self.shared.set(full_key, value, self.timeout)
+        self.local.set(full_key, value)
+        return value
+
+    def _compute_once(self, full_key, compute):
+        """
+        Fill a missed entry once. Threads of this process queue on a lock
+        for the key; processes on a lease ``add``-ed to the shared cache.
+        While another process holds the lease, wait for its value without
+        holding any lock, and compute it here if the lease expires first
+        (its holder died or is slow).
+        """
+        lease_key = f'{full_key}:lease'
+        while True:
+            with self._flight(full_key):
+                value = self.local.get(full_key)
+                if value is None:
+                    value = self.shared.get(full_key)
+                if value is not None:
+                    self._count('coalesced')
+                    return value
+                if self.shared.add(lease_key, 1, self.lease_timeout):
+                    try:
+                        # Filled between our last read and taking the lease.
+                        value = self.shared.get(full_key)
+                        if value is not None:
+                            self._count('coalesced')
+                        else:
+                            self._count('misses')
+                            value = compute()
+                            self.shared.set(full_key, value, self.timeout)
+                    finally:
+                        self.shared.delete(lease_key)
+                    # Threads waiting on the key lock re-check here before the shared cache.
+                    self.local.set(full_key, value)
+                    return value
+            time.sleep(self.lease_poll)
+
+    @contextmanager
+    def _flight(self, full_key):
+        """Hold the lock for ``full_key``, dropping it once nobody is waiting on it."""
+        with self._flights_lock:
+            flight = self._flights.setdefault(full_key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._flights_lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[full_key]
+
+    def stats(self):
+        with self._counts_lock:
+            counts = dict(self._counts)
+        lookups = sum(counts.values())
+        counts['hit_ratio'] = (lookups - counts['misses']) / lookups if lookups else 0.0
+        counts['local_entries'] = len(self.local)
+        return counts
+
+    def _count(self, name):
+        with self._counts_lock:
+            self._counts[name] += 1
+
+    def _entry_key(self, key, scopes):
+        versions = self.get_versions(scopes)
+        stamped = key + '|' + '|'.join(f'{scope}={version}' for scope, version in zip(scopes, versions))
+        return f'{self.namespace}:' + hashlib.md5(stamped.encode()).hexdigest()
+
+    def _version_key(self, scope):
+        return f'{self.namespace}:v:{scope}'
+
+
+def instance_scope(model, pk):
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def owner_scope(model, owner_id):
+    return f'{model._meta.label_lower}:owner:{owner_id}'
+
+
+def table_scope(model):
+    return f'{model._meta.label_lower}:all'
+
+
+def product_scopes(model, pk, owner_id):
+    """Every scope a write to product ``pk`` owned by ``owner_id`` invalidates."""
+    return [instance_scope(model, pk), owner_scope(model, owner_id), table_scope(model)]
+
+
+def metrics_collector(*caches):
+    """A ``sello.metrics`` collector exporting the lookup counters of ``caches``."""
+
+    def collect():
+        samples = []
+        for cache in caches:
+            stats = cache.stats()
+            for result in ('local_hits', 'shared_hits', 'coalesced', 'misses'):
+                samples.append((
+                    'sello_cache_lookups_total', 'counter', 'Versioned cache lookups by result.',
+                    {'cache': cache.namespace, 'result': result}, stats[result],
+                ))
+            samples.append((
+                'sello_cache_local_entries', 'gauge', 'Entries in the in-process LRU level.',
+                {'cache': cache.namespace}, stats['local_entries'],
+            ))
+        return samples
+
+    return collect
+
+
+_catalog_settings = getattr(settings, 'CATALOG_CACHE', {})
+
+catalog_cache = VersionedCache(
+    'catalog',
+    local_size=_catalog_settings.get('LOCAL_MAX_ENTRIES', 1024),
+    local_ttl=_catalog_settings.get('LOCAL_TTL', 30),
+    timeout=_catalog_settings.get('TIMEOUT', 300),
+)
+
+
+class CatalogCacheMixin:
+    """
+    Serve ``list`` and ``retrieve`` for a product viewset from ``catalog_cache``.
+
+    Subclasses return the scopes a response depends on from
+    ``get_list_cache_scopes()`` and ``get_detail_cache_scopes(pk)``, and
+    ``get_cache_audience()`` when different users may see different results
+    for the same URL. Keys also include the full URL (pagination cursor,
+    host).
+    """
+    catalog_cache = catalog_cache
+
+    def get_list_cache_scopes(self):
+        raise NotImplementedError
+
+    def get_detail_cache_scopes(self, pk):
+        raise NotImplementedError
+
+    def get_cache_audience(self):
+        return 'all'
+
+    def list(self, request, *args, **kwargs):
+        scopes = self.get_list_cache_scopes()
+        data = self.catalog_cache.get_or_set(
+            f'{self.basename}:list:{self.get_cache_audience()}:{request.build_absolute_uri()}', scopes,
+            lambda: super(CatalogCacheMixin, self).list(request, *args, **kwargs).data,
+        )
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        scopes = self.get_detail_cache_scopes(pk)
+        data = self.catalog_cache.get_or_set(
+            f'{self.basename}:detail:{self.get_cache_audience()}:{request.build_absolute_uri()}', scopes,
+            lambda: super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs).data,
+        )
+        return Response(data)
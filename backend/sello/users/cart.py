@@ -0,0 +1,96 @@
+"""
+Batched cart mutations.
+
+``apply_cart_operations`` folds a list of add/set/remove operations into one
+net change per product and applies it in a single transaction with
+database-side upserts, so concurrent requests never lose an increment.
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from rest_framework import serializers
+
+from .dashboard import bump_dashboards
+from .models import CartItem, Product
+
+ADD, SET, REMOVE = 'add', 'set', 'remove'
+
+
+def merge_operations(operations):
+    """
+    Collapse operations into ``{product_id: (op, quantity)}``, preserving
+    their order. ``set`` to 0 counts as ``remove``.
+    """
+    merged = {}
+    for operation in operations:
+        product_id, op = operation['product_id'], operation['op']
+        quantity = operation.get('quantity') or 0
+        if op == SET and not quantity:
+            op = REMOVE
+        previous_op, previous_quantity = merged.get(product_id, (None, 0))
+        if op == ADD and previous_op == REMOVE:
+            merged[product_id] = (SET, quantity)
+        elif op == ADD and previous_op is not None:
+            merged[product_id] = (previous_op, previous_quantity + quantity)
+        else:
+            merged[product_id] = (op, quantity)
+    return merged
+
+
+def apply_cart_operations(user, operations):
+    """
+    Apply validated cart operations for ``user`` atomically.
+
+    Runs at most four statements whatever the batch size: one existence
+    check, one DELETE for removals (after the SELECT Django runs to send
+    cart lines' delete signals), one upsert for ``set`` and an
+    insert-if-missing plus a single ``quantity = quantity + n`` UPDATE for
+    ``add``. Returns the ids of the products whose cart lines were written.
+    """
+    merged = merge_operations(operations)
+    removes = [pid for pid, (op, _) in merged.items() if op == REMOVE]
+    sets = {pid: quantity for pid, (op, quantity) in merged.items() if op == SET}
+    adds = {pid: quantity for pid, (op, quantity) in merged.items() if op == ADD}
+
+    with transaction.atomic():
+        wanted = set(sets) | set(adds)
+        existing = set(Product.objects.filter(pk__in=wanted).values_list('pk', flat=True))
+        missing = sorted(wanted - existing)
+        if missing:
+            raise serializers.ValidationError({
+                'product_id': [f"Product {pid} does not exist." for pid in missing]
+            })
+
+        if removes:
+            CartItem.objects.filter(user=user, product_id__in=removes).delete()
+
+        if sets:
+            CartItem.objects.bulk_create(
+                [CartItem(user=user, product_id=pid, quantity=quantity) for pid, quantity in sets.items()],
+                update_conflicts=True,
+                unique_fields=['user', 'product'],
+                update_fields=['quantity', 'updated_at'],
+            )
+
+        if adds:
+            CartItem.objects.bulk_create(
+                [CartItem(user=user, product_id=pid, quantity=0) for pid in adds],
+                ignore_conflicts=True,
+            )
+            quantity_field = CartItem._meta.get_field('quantity')
+            CartItem.objects.filter(user=user, product_id__in=list(adds)).update(
+                quantity=Case(
+                    *[
+                        When(product_id=pid, then=F('quantity') + Value(quantity, output_field=quantity_field))
+                        for pid, quantity in adds.items()
+                    ],
+                    default=F('quantity'),
+                    output_field=quantity_field,
+                ),
+                updated_at=timezone.now(),
+            )
+
+        # The upserts bypass model signals.
+        bump_dashboards(user.pk)
+
+    return sorted(wanted)
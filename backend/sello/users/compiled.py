@@ -0,0 +1,163 @@
+"""
+Compiled, read-only serialization from ``values()`` rows.
+
+``ValuesSerializer`` walks a ``ModelSerializer``'s fields once and turns them
+into a flat list of ``values()`` paths plus the DRF field that formats each
+one. Rows then become response dicts without instantiating models or going
+through ``Serializer.to_representation``, while still producing exactly the
+same output as the original serializer. ``many=True`` nested serializers on
+reverse foreign keys are fetched with one extra ``values()`` query each.
+
+Properties that are not database columns must be declared on the serializer
+in ``compiled_fields`` as ``{name: (paths, function)}``; the function gets
+the values of ``paths`` from the row.
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import FileField
+from django.db.models.fields.files import FieldFile
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from sello.metrics import serializer_timer
+
+
+class _Plan:
+    def __init__(self, serializer, model, prefix):
+        self.model = model
+        self.prefix = prefix
+        self.pk_path = prefix + model._meta.pk.attname
+        self.paths = [self.pk_path]
+        self.steps = []      # (kind, name, ...) in serializer field order
+        self.many = []       # (name, related_attname, plan)
+        self._compile(serializer)
+
+    def _compile(self, serializer):
+        computed = getattr(type(serializer), 'compiled_fields', {})
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = field.source
+            if isinstance(field, serializers.ListSerializer):
+                relation = self.model._meta.get_field(source)
+                child = _Plan(field.child, relation.related_model, '')
+                self.many.append((name, relation.field.attname, child))
+                self.steps.append(('many', name, self.pk_path))
+            elif isinstance(field, serializers.BaseSerializer):
+                model_field = self.model._meta.get_field(source)
+                null_path = self.prefix + model_field.attname
+                self.paths.append(null_path)
+                child = _Plan(field, model_field.related_model, f'{self.prefix}{source}__')
+                self.paths.extend(child.paths)
+                self.steps.append(('nested', name, null_path, child))
+            elif source in computed:
+                paths, function = computed[source]
+                full_paths = [self.prefix + path for path in paths]
+                self.paths.extend(full_paths)
+                self.steps.append(('column', name, full_paths, self._converter(field, function)))
+            else:
+                try:
+                    model_field = self.model._meta.get_field(source)
+                except FieldDoesNotExist:
+                    raise ImproperlyConfigured(
+                        f"Cannot compile {type(serializer).__name__}.{name}: '{source}' is not a "
+                        f"database field; declare it in compiled_fields."
+                    )
+                path = self.prefix + (model_field.attname if model_field.is_relation else source)
+                self.paths.append(path)
+                self.steps.append(('column', name, [path], self._converter(field, None, model_field)))
+        self.paths = list(dict.fromkeys(self.paths))
+
+    @staticmethod
+    def _converter(field, function, model_field=None):
+        to_representation = field.to_representation
+        if isinstance(model_field, FileField):
+            # DRF file fields expect a FieldFile (for .url), never None.
+            return lambda name: to_representation(FieldFile(None, model_field, name))
+        if function is not None:
+            def convert(*values):
+                value = function(*values)
+                return None if value is None else to_representation(value)
+            return convert
+        if isinstance(field, serializers.RelatedField):
+            return lambda pk: pk
+        return lambda value: None if value is None else to_representation(value)
+
+    def render(self, row, children):
+        data = {}
+        for kind, name, *args in self.steps:
+            if kind == 'column':
+                paths, convert = args
+                data[name] = convert(*[row[path] for path in paths])
+            elif kind == 'nested':
+                null_path, plan = args
+                data[name] = None if row[null_path] is None else plan.render(row, children)
+            else:
+                data[name] = children[name].get(row[args[0]], [])
+        return data
+
+
+class ValuesSerializer:
+    """
+    Read-only, ``values()``-backed stand-in for ``serializer_class(many=True)``.
+
+    Usage::
+
+        compiled = ValuesSerializer(ProductSerializer, context={'request': request})
+        rows = compiled.get_queryset(queryset)        # paginate or slice as needed
+        data = compiled.to_representation(rows)
+    """
+
+    def __init__(self, serializer_class, context=None):
+        serializer = serializer_class(context=context or {})
+        self.plan = _Plan(serializer, serializer_class.Meta.model, '')
+
+    def get_queryset(self, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(*self.plan.paths)
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        with serializer_timer():
+            return ReturnList(self._render(self.plan, rows), serializer=None)
+
+    def _render(self, plan, rows):
+        children = {}
+        for name, related_attname, child_plan in plan.many:
+            grouped = {}
+            if rows:
+                parent_ids = [row[plan.pk_path] for row in rows]
+                child_rows = (
+                    child_plan.model._default_manager
+                    .filter(**{f'{related_attname}__in': parent_ids})
+                    .order_by(*(child_plan.model._meta.ordering or ['pk']))
+                    .values(related_attname, *child_plan.paths)
+                )
+                child_rows = list(child_rows)
+                rendered = self._render(child_plan, child_rows)
+                for child_row, data in zip(child_rows, rendered):
+                    grouped.setdefault(child_row[related_attname], []).append(data)
+            children[name] = grouped
+        return [plan.render(row, children) for row in rows]
+
+
+
+class CompiledListMixin:
+    """
+    Serve a viewset's ``list`` through ``ValuesSerializer``.
+
+    The response is identical to the stock ``ListModelMixin.list``; only
+    pagination classes that accept ``values()`` rows (``KeysetPagination``)
+    may be used.
+    """
+
+    def get_compiled_serializer(self):
+        return ValuesSerializer(self.get_serializer_class(), context=self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_serializer()
+        rows = compiled.get_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.to_representation(page))
+        return Response(compiled.to_representation(rows))
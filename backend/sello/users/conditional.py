@@ -0,0 +1,61 @@
+"""
+Conditional GET for polled endpoints.
+
+``ConditionalGetMixin`` derives a weak ETag from something much cheaper than
+the response body (cache version stamps, ``MAX(updated_at)``/``COUNT``) and
+answers ``304 Not Modified`` when it matches the client's ``If-None-Match``,
+skipping the queryset and the serializer altogether. The ETag also covers
+the user and the full URL (filters, cursor, page size), so it is only ever
+compared against the same view of the same data.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Subclasses implement ``get_etag_parts()`` returning a list of values
+    that change whenever the response would, or ``None`` to skip
+    validation; ``get_last_modified()`` may return a datetime for views
+    whose content only changes by rows being updated.
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def get_etag_parts(self):
+        raise NotImplementedError
+
+    def get_last_modified(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(
+            request, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+    def conditional(self, request, respond):
+        if self.action not in self.conditional_actions or request.method not in ('GET', 'HEAD'):
+            return respond()
+        parts = self.get_etag_parts()
+        if parts is None:
+            return respond()
+
+        key = '|'.join(map(str, [self.basename, self.action, request.user.pk, request.get_full_path(), *parts]))
+        etag = f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+        last_modified = self.get_last_modified()
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = respond()
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,47 @@
+"""
+Per-user dashboard cache.
+
+Every dashboard is one entry under its user's scope. Signals in
+``users.signals`` bump the scopes of exactly the users a write shows up for:
+a product's owner and the customers with it in their cart, a cart's owner,
+an order's customer and its shopkeepers. Writes that bypass signals
+(bulk cart upserts, checkout, stock UPDATEs) call ``bump_dashboards``
+themselves. Concurrent misses on one dashboard compute it once
+(``single_flight``).
+"""
+from django.conf import settings
+
+from .cache import VersionedCache, instance_scope
+from .models import CartItem, Order, OrderShopkeeper, User
+
+_dashboard_settings = getattr(settings, 'DASHBOARD_CACHE', {})
+
+dashboard_cache = VersionedCache(
+    'dashboard',
+    local_size=_dashboard_settings.get('LOCAL_MAX_ENTRIES', 1024),
+    local_ttl=_dashboard_settings.get('LOCAL_TTL', 30),
+    timeout=_dashboard_settings.get('TIMEOUT', 300),
+    single_flight=True,
+)
+
+
+def dashboard_scope(user_id):
+    return instance_scope(User, user_id)
+
+
+def bump_dashboards(*user_ids):
+    """Invalidate the dashboards of ``user_ids`` (``None``s and repeats are ignored)."""
+    dashboard_cache.bump(*{dashboard_scope(user_id) for user_id in user_ids if user_id is not None})
+
+
+def cart_holders(product_ids):
+    """Ids of the users with any of ``product_ids`` in their cart."""
+    return CartItem.objects.filter(product_id__in=product_ids).values_list('user_id', flat=True).distinct()
+
+
+def order_audience(order_ids):
+    """Ids of the customers and shopkeepers whose dashboards can show ``order_ids``."""
+    return [
+        *Order.objects.filter(pk__in=order_ids).values_list('user_id', flat=True),
+        *OrderShopkeeper.objects.filter(order_id__in=order_ids).values_list('shopkeeper_id', flat=True),
+    ]
@@ -0,0 +1,121 @@
+"""
+Resized image variants for uploaded pictures.
+
+When a model saves a newly uploaded image, the variants configured in
+``IMAGE_VARIANTS`` (bounded thumbnails re-encoded as WebP by default) are
+generated in a background thread pool once the transaction commits, so the
+upload request never waits on Pillow. Variant files live next to the
+original under ``variants/`` with predictable names, which lets serializers
+expose their URLs through ``ImageVariantsField`` without touching storage.
+A variant URL may 404 for the moment between upload and generation; clients
+should fall back to the original.
+"""
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_variants():
+    return settings.IMAGE_VARIANTS
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        workers = getattr(settings, 'IMAGE_VARIANT_WORKERS', None) or 2
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-variants')
+    return _executor
+
+
+def variant_name(name, variant):
+    """
+    ``products/milk.png`` -> ``products/variants/milk.png_thumb.webp``. The
+    original's extension stays in, so ``milk.png`` and ``milk.jpg`` in one
+    directory get separate variants.
+    """
+    spec = get_variants()[variant]
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, 'variants', f"{filename}_{variant}.{spec['format'].lower()}")
+
+
+def generate_variants(storage, name):
+    """Render every configured variant of ``name`` into ``storage``, replacing old ones."""
+    with storage.open(name, 'rb') as f:
+        original = ImageOps.exif_transpose(Image.open(f))
+        original.load()
+
+    for variant, spec in get_variants().items():
+        image = original.copy()
+        image.thumbnail(spec['size'], Image.LANCZOS)
+        if spec['format'].upper() == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        buffer = BytesIO()
+        image.save(buffer, format=spec['format'], quality=spec.get('quality', 80), optimize=True)
+        target = variant_name(name, variant)
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def _generate_in_background(storage, name):
+    try:
+        generate_variants(storage, name)
+    except Exception:
+        logger.exception("Failed to generate image variants for %s", name)
+
+
+def schedule_variants(field_file):
+    """Generate variants for ``field_file`` in the pool after the current transaction commits."""
+    storage, name = field_file.storage, field_file.name
+    transaction.on_commit(lambda: get_executor().submit(_generate_in_background, storage, name))
+
+
+def register_image_fields(model, *field_names):
+    """Generate variants whenever one of ``field_names`` on ``model`` receives a new upload."""
+
+    def mark_new_uploads(sender, instance, **kwargs):
+        # FileField.pre_save commits new uploads after this signal fires.
+        instance._new_image_fields = [
+            field_name for field_name in field_names
+            if getattr(instance, field_name) and not getattr(instance, field_name)._committed
+        ]
+
+    def schedule_new_uploads(sender, instance, **kwargs):
+        for field_name in getattr(instance, '_new_image_fields', ()):
+            schedule_variants(getattr(instance, field_name))
+        instance._new_image_fields = []
+
+    uid = f'image-variants:{model._meta.label_lower}'
+    pre_save.connect(mark_new_uploads, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(schedule_new_uploads, sender=model, weak=False, dispatch_uid=uid)
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """
+    Read-only ``{variant: url}`` for an image field (pass it as ``source``),
+    or ``None`` when there is no image. URLs are absolute when the serializer
+    has a request in its context, like DRF's ``ImageField``.
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get('request')
+        urls = {}
+        for variant in get_variants():
+            url = value.storage.url(variant_name(value.name, variant))
+            urls[variant] = request.build_absolute_uri(url) if request is not None else url
+        return urls
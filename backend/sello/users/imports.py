@@ -0,0 +1,188 @@
+"""
+Bulk product import from CSV or JSON Lines.
+
+Rows are streamed from the file, validated a chunk at a time with
+``ProductImportSerializer`` (pure Python, no queries) and the valid ones of
+each chunk are written with one ``bulk_create`` in their own transaction.
+Invalid rows are reported with their row number and skipped.
+
+Rows are numbered from 1 in file order (the CSV header and blank JSONL lines
+don't count). After every chunk the report's ``next_row`` is the first row
+not yet processed; passing it back as ``start_row`` resumes an interrupted
+import without duplicating products.
+
+Over HTTP the client may not live to see a report, so the position is also
+kept server-side: a ``ProductImport`` checkpoint is updated in the same
+transaction as each chunk, and uploading the same file (or ``import_id``)
+again carries on from it.
+"""
+import csv
+import hashlib
+import io
+import json
+import time
+
+from django.db import transaction
+
+from .cache import catalog_cache, owner_scope, table_scope
+from .dashboard import bump_dashboards
+from .models import Product, ProductImport
+from .serializers import ProductImportSerializer
+
+CSV, JSONL = 'csv', 'jsonl'
+FORMATS = (CSV, JSONL)
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+def file_digest(binary_file):
+    """SHA-256 of a seekable file's contents, leaving it rewound."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: binary_file.read(1 << 20), b''):
+        digest.update(block)
+    binary_file.seek(0)
+    return digest.hexdigest()
+
+
+def get_checkpoint(owner, key):
+    return ProductImport.objects.get_or_create(owner=owner, key=key)[0]
+
+
+def checkpoint_as_dict(checkpoint):
+    return {
+        'import_id': checkpoint.key,
+        'next_row': checkpoint.next_row,
+        'created': checkpoint.created,
+        'failed': checkpoint.failed,
+        'finished': checkpoint.finished,
+        'updated_at': checkpoint.updated_at,
+    }
+
+
+def guess_format(filename):
+    return JSONL if filename.lower().endswith(('.jsonl', '.ndjson')) else CSV
+
+
+def read_rows(binary_file, file_format):
+    """Yield ``(row_number, data)`` from an open binary file; unparsable JSONL lines yield ``None`` data."""
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    try:
+        if file_format == CSV:
+            for row_number, row in enumerate(csv.DictReader(text), start=1):
+                # Empty cells mean "not given", so model defaults apply.
+                yield row_number, {key: value for key, value in row.items() if key and value not in ('', None)}
+        else:
+            row_number = 0
+            for line in text:
+                if not line.strip():
+                    continue
+                row_number += 1
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    data = None
+                yield row_number, data if isinstance(data, dict) else None
+    finally:
+        text.detach()
+
+
+class ImportReport:
+    def __init__(self, start_row):
+        self.start_row = start_row
+        self.next_row = start_row
+        self.processed = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return round(self.processed / self.elapsed, 1) if self.elapsed else 0.0
+
+    def add_error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'start_row': self.start_row,
+            'next_row': self.next_row,
+            'processed': self.processed,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': self.rows_per_second,
+        }
+
+
+class ProductImporter:
+    """
+    Import rows for ``owner`` in chunks of ``chunk_size``.
+
+    ``on_chunk(report)`` is called after each committed chunk, e.g. to save a
+    checkpoint or print progress. A ``checkpoint`` (``ProductImport``) is
+    advanced inside each chunk's transaction instead, so it can never lag
+    or run ahead of the rows written.
+    """
+
+    def __init__(self, owner, chunk_size=DEFAULT_CHUNK_SIZE, start_row=1, on_chunk=None, checkpoint=None):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.start_row = max(start_row, 1)
+        self.on_chunk = on_chunk
+        self.checkpoint = checkpoint
+
+    def run(self, rows):
+        report = ImportReport(self.start_row)
+        chunk = []
+        for row_number, data in rows:
+            if row_number < self.start_row:
+                continue
+            chunk.append((row_number, data))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk, report)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk, report)
+        if self.checkpoint is not None:
+            self.checkpoint.finished = True
+            self.checkpoint.save(update_fields=['finished', 'updated_at'])
+        report.elapsed = time.perf_counter() - report.started_at
+        return report
+
+    def _import_chunk(self, chunk, report):
+        failed_before = report.failed
+        products = []
+        for row_number, data in chunk:
+            if data is None:
+                report.add_error(row_number, {'non_field_errors': ["Row is not a JSON object."]})
+                continue
+            serializer = ProductImportSerializer(data=data)
+            if serializer.is_valid():
+                products.append(Product(created_by=self.owner, **serializer.validated_data))
+            else:
+                report.add_error(row_number, serializer.errors)
+
+        with transaction.atomic():
+            if products:
+                Product.objects.bulk_create(products)
+                # bulk_create skips the post_save cache invalidation.
+                catalog_cache.bump(owner_scope(Product, self.owner.pk), table_scope(Product))
+                bump_dashboards(self.owner.pk)
+            if self.checkpoint is not None:
+                self.checkpoint.next_row = chunk[-1][0] + 1
+                self.checkpoint.created += len(products)
+                self.checkpoint.failed += report.failed - failed_before
+                self.checkpoint.save(update_fields=['next_row', 'created', 'failed', 'updated_at'])
+
+        report.created += len(products)
+        report.processed += len(chunk)
+        report.next_row = chunk[-1][0] + 1
+        report.elapsed = time.perf_counter() - report.started_at
+        if self.on_chunk is not None:
+            self.on_chunk(report)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from products.models import Product as ShopProduct
+from profiles.models import CustomerProfile, ShopkeeperProfile
+from users.images import generate_variants
+from users.models import Product
+
+IMAGE_FIELDS = [
+    (Product, 'image'),
+    (ShopProduct, 'image'),
+    (CustomerProfile, 'profile_picture'),
+    (ShopkeeperProfile, 'store_logo'),
+    (ShopkeeperProfile, 'store_banner'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Generate (or regenerate) resized variants for every stored image.'
+
+    def handle(self, *args, **options):
+        generated = failed = 0
+        for model, field_name in IMAGE_FIELDS:
+            names = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True).iterator()
+            )
+            storage = model._meta.get_field(field_name).storage
+            for name in names:
+                try:
+                    generate_variants(storage, name)
+                    generated += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'{name}: {e}')
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {generated} images ({failed} failed).'))
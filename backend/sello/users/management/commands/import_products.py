@@ -0,0 +1,58 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.imports import DEFAULT_CHUNK_SIZE, FORMATS, ProductImporter, guess_format, read_rows
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Bulk-import products for a shopkeeper from a CSV or JSONL file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--owner', required=True, help='email of the shopkeeper who owns the products')
+        parser.add_argument('--format', choices=FORMATS, help='defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--start-row', type=int, default=1)
+        parser.add_argument(
+            '--checkpoint',
+            help='file recording the next row after every chunk; an existing one resumes the import',
+        )
+        parser.add_argument('--errors', help='write per-row errors to this JSON file')
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(email=options['owner'].lower(), role='SHOPKEEPER')
+        except User.DoesNotExist:
+            raise CommandError(f"No shopkeeper with email {options['owner']}")
+
+        checkpoint = options['checkpoint']
+        start_row = options['start_row']
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                start_row = int(f.read().strip() or 1)
+            self.stdout.write(f'Resuming from row {start_row}.')
+
+        def on_chunk(report):
+            if checkpoint:
+                with open(checkpoint, 'w') as f:
+                    f.write(f'{report.next_row}\n')
+            self.stdout.write(
+                f'rows {report.start_row}-{report.next_row - 1}: {report.created} created, '
+                f'{report.failed} failed, {report.rows_per_second} rows/s'
+            )
+
+        importer = ProductImporter(owner, chunk_size=options['chunk_size'], start_row=start_row, on_chunk=on_chunk)
+        file_format = options['format'] or guess_format(options['path'])
+        with open(options['path'], 'rb') as f:
+            report = importer.run(read_rows(f, file_format))
+
+        if options['errors']:
+            with open(options['errors'], 'w') as f:
+                json.dump(report.errors, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.created} products ({report.failed} rows failed) from '
+            f'{report.processed} rows in {report.elapsed:.2f}s, {report.rows_per_second} rows/s.'
+        ))
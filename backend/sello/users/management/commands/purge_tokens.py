@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from users.blacklist import token_blacklist
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding refresh tokens (and their blacklist entries) in small '
+        'batches, so the purge never holds long locks on the token tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between batches')
+        parser.add_argument('--interval', type=float, help='keep purging every INTERVAL seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            deleted = self.purge(options['batch_size'], options['pause'])
+            if deleted:
+                # Purged JTIs would only cost filter space (and false positives); rebuild without them.
+                token_blacklist.invalidate()
+            self.stdout.write(f'Purged {deleted} expired tokens.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    @staticmethod
+    def purge(batch_size, pause):
+        cutoff = aware_utcnow()
+        deleted = 0
+        while True:
+            ids = list(OutstandingToken.objects.filter(expires_at__lte=cutoff)
+                       .order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            # Cascades to BlacklistedToken.
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            if len(ids) < batch_size:
+                return deleted
+            time.sleep(pause)
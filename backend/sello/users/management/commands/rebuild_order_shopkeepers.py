@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from users.shopkeeper_orders import rebuild_order_shopkeepers
+
+
+class Command(BaseCommand):
+    help = 'Add any missing order-to-shopkeeper links from order history.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        added = rebuild_order_shopkeepers(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Added {added} order-to-shopkeeper links.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.sales import rebuild_sales_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the shopkeeper and product sales rollups from order history.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            products, shopkeepers = rebuild_sales_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt sales rollups for {products} products and {shopkeepers} shopkeepers.'
+        ))
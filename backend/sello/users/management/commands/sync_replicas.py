@@ -0,0 +1,42 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the SQLite primary into the replica files in DB_REPLICAS, for local '
+        'testing of replica routing. Server databases replicate on their own.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='keep copying every INTERVAL seconds')
+
+    def handle(self, *args, **options):
+        replicas = list(getattr(settings, 'REPLICA_DATABASES', ()))
+        if not replicas:
+            raise CommandError('No replicas configured; set DB_REPLICAS.')
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('sync_replicas only copies SQLite databases.')
+
+        while True:
+            for alias in replicas:
+                self._copy(connections[DEFAULT_DB_ALIAS].settings_dict['NAME'], connections[alias].settings_dict['NAME'])
+                self.stdout.write(f'Copied primary to {alias}.')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    @staticmethod
+    def _copy(source_name, target_name):
+        # The backup API takes a consistent snapshot even while the primary is written to.
+        source = sqlite3.connect(source_name)
+        target = sqlite3.connect(target_name)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
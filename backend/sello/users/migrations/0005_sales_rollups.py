@@ -0,0 +1,63 @@
+# Generated by Django 5.0 on 2026-10-18 06:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    # A frozen copy of users.sales.rebuild_sales_rollups, on historical models.
+    OrderItem = apps.get_model('users', 'OrderItem')
+    ProductSales = apps.get_model('users', 'ProductSales')
+    ShopkeeperSales = apps.get_model('users', 'ShopkeeperSales')
+
+    line_total = models.ExpressionWrapper(
+        models.F('quantity') * models.F('price'), output_field=models.DecimalField(max_digits=14, decimal_places=2)
+    )
+    totals = {
+        'total_sales': models.Sum(line_total),
+        'units_sold': models.Sum('quantity'),
+        'order_count': models.Count('order_id', distinct=True),
+    }
+    items = OrderItem.objects.filter(product__isnull=False).order_by()
+    product_rows = items.values('product_id').annotate(**totals)
+    shopkeeper_rows = items.values(shopkeeper_id=models.F('product__created_by_id')).annotate(**totals)
+    ProductSales.objects.bulk_create([ProductSales(**row) for row in product_rows], batch_size=500)
+    ShopkeeperSales.objects.bulk_create([ShopkeeperSales(**row) for row in shopkeeper_rows], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSales',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sales', serialize=False, to='users.product')),
+                ('total_sales', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('units_sold', models.PositiveBigIntegerField(default=0)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'product sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='ShopkeeperSales',
+            fields=[
+                ('shopkeeper', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sales', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_sales', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('units_sold', models.PositiveBigIntegerField(default=0)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'shopkeeper sales',
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.0 on 2026-10-18 06:41
+
+from django.db import migrations
+
+# Full-text index over users_product, kept in sync by triggers. Only
+# created on SQLite; other backends fall back to LIKE queries in
+# users/search.py.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE users_product_fts USING fts5(
+        name, description,
+        content='users_product', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER users_product_fts_insert AFTER INSERT ON users_product BEGIN
+        INSERT INTO users_product_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER users_product_fts_delete AFTER DELETE ON users_product BEGIN
+        INSERT INTO users_product_fts(users_product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER users_product_fts_update AFTER UPDATE OF name, description ON users_product BEGIN
+        INSERT INTO users_product_fts(users_product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO users_product_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO users_product_fts(users_product_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS users_product_fts_update",
+    "DROP TRIGGER IF EXISTS users_product_fts_delete",
+    "DROP TRIGGER IF EXISTS users_product_fts_insert",
+    "DROP TABLE IF EXISTS users_product_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in CREATE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
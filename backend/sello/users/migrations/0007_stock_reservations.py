@@ -0,0 +1,70 @@
+# Generated by Django 5.0 on 2026-10-18 06:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Adding reserved_stock makes SQLite rebuild users_product, which drops the
+# full-text sync triggers from 0006; recreate them and reindex.
+SEARCH_TRIGGERS_SQL = [
+    "DROP TRIGGER IF EXISTS users_product_fts_insert",
+    "DROP TRIGGER IF EXISTS users_product_fts_delete",
+    "DROP TRIGGER IF EXISTS users_product_fts_update",
+    """
+    CREATE TRIGGER users_product_fts_insert AFTER INSERT ON users_product BEGIN
+        INSERT INTO users_product_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER users_product_fts_delete AFTER DELETE ON users_product BEGIN
+        INSERT INTO users_product_fts(users_product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER users_product_fts_update AFTER UPDATE OF name, description ON users_product BEGIN
+        INSERT INTO users_product_fts(users_product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO users_product_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO users_product_fts(users_product_fts) VALUES ('rebuild')",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in SEARCH_TRIGGERS_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reserved_stock',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='users.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'expires_at'], name='users_reservation_user_idx'), models.Index(fields=['expires_at'], name='users_reservation_expiry_idx')],
+            },
+        ),
+    ]
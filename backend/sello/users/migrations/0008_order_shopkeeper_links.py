@@ -0,0 +1,48 @@
+# Generated by Django 5.0 on 2026-10-18 06:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_links(apps, schema_editor):
+    # A frozen copy of users.shopkeeper_orders.rebuild_order_shopkeepers, on historical models.
+    OrderItem = apps.get_model('users', 'OrderItem')
+    OrderShopkeeper = apps.get_model('users', 'OrderShopkeeper')
+
+    rows = (
+        OrderItem.objects.filter(product__isnull=False)
+        .values_list('order_id', 'product__created_by_id', 'order__created_at')
+        .distinct().order_by('order_id').iterator(chunk_size=1000)
+    )
+    batch = []
+    for order_id, shopkeeper_id, created_at in rows:
+        batch.append(OrderShopkeeper(order_id=order_id, shopkeeper_id=shopkeeper_id, created_at=created_at))
+        if len(batch) >= 1000:
+            OrderShopkeeper.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    OrderShopkeeper.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderShopkeeper',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('order', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='shopkeeper_links', to='users.order')),
+                ('shopkeeper', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='order_links', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['shopkeeper', 'created_at', 'order'], name='users_ordershopkeeper_idx')],
+                'unique_together': {('order', 'shopkeeper')},
+            },
+        ),
+        migrations.RunPython(backfill_links, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils.translation import gettext_lazy as _
@@ -71,6 +73,10 @@ class Product(models.Model):
         ('Dairy', 'Dairy'),
         ('Grocery', 'Grocery'),
     ]
+    SUBCATEGORY_CHOICES = {
+        'Dairy': ['Milk', 'Cheese', 'Butter', 'Yogurt', 'Paneer', 'Cream'],
+        'Grocery': ['Rice', 'Pulses', 'Flour', 'Oil', 'Spices', 'Sugar', 'Salt'],
+    }
     
     name = models.CharField(max_length=200)
     description = models.TextField()
@@ -82,6 +88,9 @@ class Product(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     subcategory = models.CharField(max_length=50)
     stock = models.PositiveIntegerField(default=0)
+    # Units held by checkouts in progress (users/reservations.py); only ever
+    # changed with F() updates, so save() leaves it alone.
+    reserved_stock = models.PositiveIntegerField(default=0)
     image = models.ImageField(upload_to='products/', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -90,8 +99,52 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'reserved_stock'
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def available_stock(self):
+        return self.stock - self.reserved_stock
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='users_product_created_idx'),
+            models.Index(fields=['created_by', 'created_at', 'id'], name='users_product_owner_idx'),
+        ]
+
+CENTS = Decimal('0.01')
+
+class CartItemQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate each line with its product's current ``unit_price`` and ``line_total``, in SQL."""
+        return self.annotate(
+            unit_price=models.F('product__price'),
+            line_total=models.ExpressionWrapper(
+                models.F('quantity') * models.F('product__price'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
+    def summary(self):
+        """Line count, unit count and total of these lines, in one aggregate query."""
+        summary = self.aggregate(
+            item_count=models.Count('id'),
+            units=models.Sum('quantity', default=0),
+            total=models.Sum(
+                models.F('quantity') * models.F('product__price'),
+                default=Decimal('0.00'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+        # SQLite hands back the product's full precision.
+        summary['total'] = summary['total'].quantize(CENTS)
+        return summary
 
 class CartItem(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cart_items')
@@ -100,14 +153,23 @@ class CartItem(models.Model):
     added_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartItemQuerySet.as_manager()
+
     class Meta:
         unique_together = ('user', 'product')
+        indexes = [
+            models.Index(fields=['user', 'added_at', 'id'], name='users_cartitem_user_added_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email}'s cart - {self.product.name}"
 
     @property
     def total_price(self):
+        # Lines loaded through CartItem.objects.with_totals() carry it already,
+        # at full precision on SQLite.
+        if 'line_total' in self.__dict__:
+            return self.line_total.quantize(CENTS)
         return self.quantity * self.product.price
 
 class Order(models.Model):
@@ -126,6 +188,12 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='users_order_created_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='users_order_user_idx'),
+        ]
+
     def __str__(self):
         return f"Order {self.id} by {self.user.email}"
 
@@ -142,3 +210,84 @@ class OrderItem(models.Model):
     @property
     def total_price(self):
         return self.quantity * self.price
+
+class OrderShopkeeper(models.Model):
+    """An order's link to a shopkeeper who sold something in it (users/shopkeeper_orders.py)."""
+    # The unique and composite indexes below cover lookups by either column.
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='shopkeeper_links', db_index=False)
+    shopkeeper = models.ForeignKey(User, on_delete=models.CASCADE, related_name='order_links', db_index=False)
+    created_at = models.DateTimeField()  # The order's, copied so the index below can order by it
+
+    class Meta:
+        unique_together = ('order', 'shopkeeper')
+        indexes = [
+            models.Index(fields=['shopkeeper', 'created_at', 'order'], name='users_ordershopkeeper_idx'),
+        ]
+
+    def __str__(self):
+        return f"Order {self.order_id} for shopkeeper {self.shopkeeper_id}"
+
+class StockReservation(models.Model):
+    """Units of a product held for a user's checkout until ``expires_at``."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'expires_at'], name='users_reservation_user_idx'),
+            models.Index(fields=['expires_at'], name='users_reservation_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity}x product {self.product_id} held for user {self.user_id}"
+
+class ShopkeeperSales(models.Model):
+    """Running sales totals for a shopkeeper, maintained at checkout."""
+    shopkeeper = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='sales'
+    )
+    total_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units_sold = models.PositiveBigIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'shopkeeper sales'
+
+    def __str__(self):
+        return f"Sales for {self.shopkeeper_id}"
+
+class ProductSales(models.Model):
+    """Running sales totals for a single product, maintained at checkout."""
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name='sales'
+    )
+    total_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units_sold = models.PositiveBigIntegerField(default=0)
+    order_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'product sales'
+
+    def __str__(self):
+        return f"Sales for product {self.product_id}"
+
+class ProductImport(models.Model):
+    """Progress of a product import over HTTP, committed with each chunk (users/imports.py)."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='product_imports')
+    key = models.CharField(max_length=64)  # The client's import_id, or a digest of the file
+    next_row = models.PositiveIntegerField(default=1)
+    created = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('owner', 'key')
+
+    def __str__(self):
+        return f"Import {self.key} by {self.owner_id} at row {self.next_row}"
@@ -0,0 +1,176 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on a tuple of columns, ``(created_at, id)`` by
+    default.
+
+    Unlike DRF's ``CursorPagination`` (which keys on a single column and falls
+    back to an offset for ties), the cursor stores the full key of the last row
+    seen, so every page is a plain range scan over a composite index and deep
+    pages cost the same as the first one.
+
+    Views can key on other columns by setting ``pagination_ordering``,
+    including columns of a joined table (``'-links__created_at'``) when that
+    table's index is the one to scan.
+    """
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'pagination_ordering', self.ordering))
+        self.fields = [self._get_model_field(queryset.model, name.lstrip('-')) for name in self.ordering]
+
+        # Columns across a relation are keyed on an alias, so the cursor
+        # filter reuses the join the queryset already has instead of adding one.
+        self.keys = []
+        for index, name in enumerate(self.ordering):
+            column = name.lstrip('-')
+            if '__' in column:
+                queryset = queryset.annotate(**{f'_cursor{index}': F(column)})
+                self.keys.append(name.replace(column, f'_cursor{index}'))
+            else:
+                self.keys.append(name)
+
+        cursor = self.decode_cursor(request)
+        reverse, position = cursor if cursor else (False, None)
+
+        ordering = self._invert(self.keys) if reverse else tuple(self.keys)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            if has_more or reverse:
+                self.next_position = self._get_position(results[-1])
+            if (has_more and reverse) or (position is not None and not reverse):
+                self.previous_position = self._get_position(results[0])
+        elif position is not None:
+            # Paged past either end; offer a way back from where we are.
+            if reverse:
+                self.next_position = position
+            else:
+                self.previous_position = position
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                value = int(request.query_params[self.page_size_query_param])
+                if value > 0:
+                    return min(value, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(False, self.next_position)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(True, self.previous_position)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def encode_cursor(self, reverse, position):
+        payload = json.dumps([int(reverse), [self._dump(value) for value in position]])
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            reverse, values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if len(values) != len(self.fields):
+                raise ValueError
+            position = [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (TypeError, ValueError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return bool(reverse), position
+
+    def _after(self, ordering, position):
+        """Build ``(a, b, ...) > (x, y, ...)`` for a mixed-direction ordering."""
+        condition = Q()
+        equal = {}
+        for name, value in zip(ordering, position):
+            column = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{column}__{lookup}': value})
+            equal[column] = value
+        return condition
+
+    def _get_position(self, item):
+        names = [name.lstrip('-') for name in self.keys]
+        if isinstance(item, dict):
+            return [item[name] for name in names]
+        return [
+            getattr(item, name if name.startswith('_cursor') else field.attname)
+            for name, field in zip(names, self.fields)
+        ]
+
+    @staticmethod
+    def _invert(ordering):
+        return tuple(name[1:] if name.startswith('-') else '-' + name for name in ordering)
+
+    @staticmethod
+    def _get_model_field(model, name):
+        *relations, name = name.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+    @staticmethod
+    def _dump(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
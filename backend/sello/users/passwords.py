@@ -0,0 +1,46 @@
+"""
+Password hashing off the request thread.
+
+PBKDF2 is deliberately slow. The async authentication views hand it to a
+small, bounded thread pool (``hashlib`` releases the GIL while hashing) so a
+burst of logins queues there instead of occupying the workers that serve
+every other endpoint.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or min(4, os.cpu_count() or 1)
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+    return _executor
+
+
+async def run_hasher(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), func, *args)
+
+
+async def averify_password(password, encoded):
+    """
+    Check ``password`` against ``encoded`` in the hashing pool.
+
+    Returns ``(is_correct, new_encoded)``; ``new_encoded`` is set when the
+    stored hash uses outdated parameters and should be replaced.
+    """
+    is_correct, must_update = await run_hasher(verify_password, password, encoded)
+    if is_correct and must_update:
+        return True, await run_hasher(make_password, password)
+    return is_correct, None
+
+
+async def amake_password(password):
+    return await run_hasher(make_password, password)
@@ -0,0 +1,168 @@
+"""
+Stock holds for checkouts in progress.
+
+``reserve_cart`` runs when checkout begins and holds every cart line for
+``STOCK_RESERVATION_TTL`` seconds. It moves units into the product's
+``reserved_stock`` counter with one guarded UPDATE, so available stock
+(``stock - reserved_stock``) is always read from the row, never summed
+over reservations. Placing the order turns the holds into stock taken
+(``take_stock``). Holds that are never used are released by a job
+(``users.tasks.release_expired_reservations``) queued for their expiry time.
+
+Every step is one short transaction that ends with the product UPDATE, so
+concurrent checkouts of a hot product contend for its row only for the
+length of one statement, never for a whole request.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+from rest_framework import serializers
+
+from jobs.queue import enqueue
+
+from .cache import catalog_cache, product_scopes
+from .dashboard import bump_dashboards, cart_holders
+from .models import CartItem, Product, StockReservation
+
+
+def get_reservation_ttl():
+    return getattr(settings, 'STOCK_RESERVATION_TTL', 600)
+
+
+def reserve_cart(user):
+    """
+    Hold stock for everything in ``user``'s cart, replacing any earlier
+    holds; returns the new ``StockReservation``s. Raises ``ValidationError``
+    if any line cannot be covered, leaving nothing held.
+    """
+    with transaction.atomic():
+        release_reservations(user=user)
+
+        quantities = defaultdict(int)
+        for product_id, quantity in CartItem.objects.filter(user=user).values_list('product_id', 'quantity'):
+            quantities[product_id] += quantity
+        if not quantities:
+            raise serializers.ValidationError("Cart is empty")
+
+        products = Product.objects.in_bulk(list(quantities))
+        shortages = shortage_messages(products, quantities)
+        if shortages:
+            raise serializers.ValidationError({'stock': shortages})
+
+        expires_at = timezone.now() + timedelta(seconds=get_reservation_ttl())
+        reservations = StockReservation.objects.bulk_create([
+            StockReservation(user=user, product_id=product_id, quantity=quantity, expires_at=expires_at)
+            for product_id, quantity in quantities.items()
+        ])
+        enqueue('users.release_expired_reservations', delay=get_reservation_ttl())
+        _update_stock(products, quantities, {}, take=False)
+    return reservations
+
+
+def claim_reservations(user):
+    """
+    Delete ``user``'s unexpired holds and return ``{product_id: quantity}``.
+
+    Must run inside the transaction that then calls ``take_stock`` with the
+    result. ``user``'s expired holds are released first, so their units are
+    available again even when no job worker has got to them.
+    """
+    release_reservations(user=user, expired=True)
+    held = defaultdict(int)
+    reservations = list(
+        StockReservation.objects.select_for_update()
+        .filter(user=user, expires_at__gt=timezone.now())
+        .values_list('pk', 'product_id', 'quantity')
+    )
+    for _, product_id, quantity in reservations:
+        held[product_id] += quantity
+    StockReservation.objects.filter(pk__in=[pk for pk, _, _ in reservations]).delete()
+    return dict(held)
+
+
+def take_stock(products, quantities, held):
+    """
+    Take ``quantities`` out of stock, using up the ``held`` units first.
+
+    Holds on products no longer in the cart are given back. One guarded
+    UPDATE covers every product; if any product cannot cover its lines from
+    its hold plus what is available, nothing changes and ``ValidationError``
+    is raised.
+    """
+    _update_stock(products, quantities, held, take=True)
+
+
+def release_reservations(user=None, expired=False):
+    """Release holds (of ``user``, and/or only expired ones) and give the units back."""
+    reservations = StockReservation.objects.select_for_update()
+    if user is not None:
+        reservations = reservations.filter(user=user)
+    if expired:
+        reservations = reservations.filter(expires_at__lte=timezone.now())
+
+    with transaction.atomic():
+        released = defaultdict(int)
+        rows = list(reservations.values_list('pk', 'product_id', 'quantity'))
+        if not rows:
+            return 0
+        for _, product_id, quantity in rows:
+            released[product_id] += quantity
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+        _update_stock(Product.objects.in_bulk(list(released)), {}, released, take=True)
+    return len(rows)
+
+
+def shortage_messages(products, quantities, held=None):
+    held = held or {}
+    return [
+        f"Only {products[product_id].available_stock + held.get(product_id, 0)} of "
+        f"{products[product_id].name} left in stock."
+        for product_id, quantity in quantities.items()
+        if products[product_id].available_stock + held.get(product_id, 0) < quantity
+    ]
+
+
+def _update_stock(products, quantities, held, take):
+    """
+    For every product in ``quantities`` or ``held``, in one UPDATE: with
+    ``take``, ``stock -= quantity`` and ``reserved_stock -= held``; without,
+    ``reserved_stock += quantity``. Each row must keep
+    ``stock >= reserved_stock``.
+    """
+    stock_field = Product._meta.get_field('stock')
+    guard = Q()
+    new_stock, new_reserved = [], []
+    for product_id in {*quantities, *held}:
+        quantity, hold = quantities.get(product_id, 0), held.get(product_id, 0)
+        reserved_change = -hold if take else quantity
+        # stock - quantity >= reserved_stock + reserved_change, rearranged for the database.
+        needed = (quantity if take else 0) + reserved_change
+        guard |= Q(pk=product_id, stock__gte=F('reserved_stock') + Value(needed))
+        if take:
+            new_stock.append(When(pk=product_id, then=F('stock') - Value(quantity, output_field=stock_field)))
+        new_reserved.append(
+            When(pk=product_id, then=F('reserved_stock') + Value(reserved_change, output_field=stock_field))
+        )
+
+    changes = {
+        'reserved_stock': Case(*new_reserved, default=F('reserved_stock'), output_field=stock_field),
+        'updated_at': timezone.now(),
+    }
+    if take:
+        changes['stock'] = Case(*new_stock, default=F('stock'), output_field=stock_field)
+    updated = Product.objects.filter(guard).update(**changes)
+    if updated != len(new_reserved):
+        raise serializers.ValidationError({'stock': ["Some items in your cart are out of stock."]})
+
+    # The conditional UPDATE bypasses model signals.
+    catalog_cache.bump(*{
+        scope
+        for product in products.values()
+        for scope in product_scopes(Product, product.pk, product.created_by_id)
+    })
+    # Available stock shows on the owners' dashboards and in every cart holding the product.
+    bump_dashboards(*[product.created_by_id for product in products.values()], *cart_holders(list(products)))
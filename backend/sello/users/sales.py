@@ -0,0 +1,103 @@
+"""
+Per-shopkeeper and per-product sales rollups.
+
+Totals are kept in ``ShopkeeperSales`` / ``ProductSales`` and bumped in the
+same transaction that writes an order's items, so dashboards read a single
+row instead of summing order history on every request.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, Sum, Value, When
+from django.utils import timezone
+
+from .models import OrderItem, ProductSales, ShopkeeperSales
+
+ROLLUP_FIELDS = ('total_sales', 'units_sold', 'order_count')
+
+
+def record_order_sales(order_items):
+    """
+    Add the given ``OrderItem``s (all from one order) to the rollups.
+
+    Must run inside the transaction that created the items. Each item needs
+    its ``product`` loaded, since the product's owner decides which
+    shopkeeper the line is credited to.
+    """
+    by_product = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+    by_shopkeeper = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+
+    for item in order_items:
+        if item.product is None:
+            continue
+        amount = item.quantity * item.price
+        for totals in (by_product[item.product_id], by_shopkeeper[item.product.created_by_id]):
+            totals['total_sales'] += amount
+            totals['units_sold'] += item.quantity
+            totals['order_count'] = 1
+
+    _increment(ProductSales, 'product_id', by_product)
+    _increment(ShopkeeperSales, 'shopkeeper_id', by_shopkeeper)
+
+
+def get_shopkeeper_sales(shopkeeper):
+    """Return the shopkeeper's running sales total."""
+    total = (
+        ShopkeeperSales.objects.filter(pk=shopkeeper.pk)
+        .values_list('total_sales', flat=True)
+        .first()
+    )
+    return total if total is not None else Decimal('0.00')
+
+
+def rebuild_sales_rollups():
+    """
+    Recompute both rollup tables from order history.
+
+    Lines whose product has since been deleted cannot be attributed to a
+    shopkeeper and are skipped.
+    """
+    line_total = ExpressionWrapper(
+        F('quantity') * F('price'), output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+    items = OrderItem.objects.filter(product__isnull=False).order_by()
+
+    product_rows = items.values('product_id').annotate(
+        total_sales=Sum(line_total), units_sold=Sum('quantity'),
+        order_count=Count('order_id', distinct=True),
+    )
+    shopkeeper_rows = items.values(shopkeeper_id=F('product__created_by_id')).annotate(
+        total_sales=Sum(line_total), units_sold=Sum('quantity'),
+        order_count=Count('order_id', distinct=True),
+    )
+
+    ProductSales.objects.all().delete()
+    ShopkeeperSales.objects.all().delete()
+    ProductSales.objects.bulk_create(
+        [ProductSales(**row) for row in product_rows], batch_size=500
+    )
+    ShopkeeperSales.objects.bulk_create(
+        [ShopkeeperSales(**row) for row in shopkeeper_rows], batch_size=500
+    )
+    return len(product_rows), len(shopkeeper_rows)
+
+
+def _increment(model, key, deltas):
+    """Upsert ``deltas`` ({key value: {field: amount}}) into ``model`` with two statements."""
+    if not deltas:
+        return
+    model.objects.bulk_create(
+        [model(**{key: pk}) for pk in deltas], ignore_conflicts=True
+    )
+    updates = {}
+    for field in ROLLUP_FIELDS:
+        output_field = model._meta.get_field(field)
+        updates[field] = Case(
+            *[
+                When(pk=pk, then=F(field) + Value(values[field], output_field=output_field))
+                for pk, values in deltas.items()
+            ],
+            default=F(field),
+            output_field=output_field,
+        )
+    model.objects.filter(pk__in=list(deltas)).update(updated_at=timezone.now(), **updates)
@@ -0,0 +1,135 @@
+"""
+Product search over ``name`` and ``description``.
+
+On SQLite this uses the ``users_product_fts`` FTS5 index (see migration
+0006), ranked with BM25; a single statement returns the requested page of
+hits together with category/subcategory facet counts for the whole match
+set. Other backends fall back to case-insensitive LIKE matching.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Count, Q
+
+from .models import Product
+
+# Relative BM25 weights for the indexed columns (name, description).
+NAME_WEIGHT = 5.0
+DESCRIPTION_WEIGHT = 1.0
+
+SEARCH_SQL = """
+    WITH hits AS (
+        SELECT p.id, p.category, p.subcategory,
+               bm25(users_product_fts, %s, %s) AS rank
+        FROM users_product_fts
+        JOIN users_product p ON p.id = users_product_fts.rowid
+        WHERE users_product_fts MATCH %s {owner_filter}
+    )
+    SELECT 'hit', id, rank, NULL, NULL, NULL FROM (
+        SELECT id, rank FROM hits
+        WHERE 1 = 1 {facet_filter}
+        ORDER BY rank, id
+        LIMIT %s OFFSET %s
+    )
+    UNION ALL
+    SELECT 'facet', NULL, NULL, category, subcategory, COUNT(*)
+    FROM hits
+    GROUP BY category, subcategory
+"""
+
+
+class SearchResult:
+    def __init__(self, product_ids, count, facets):
+        self.product_ids = product_ids
+        self.count = count
+        self.facets = facets
+
+
+def to_match_expression(query):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    terms = re.findall(r'\w+', query)
+    return ' '.join('"{}"*'.format(term) for term in terms)
+
+
+def search_products(query, owner=None, category=None, subcategory=None, limit=20, offset=0):
+    """
+    Return a ``SearchResult`` with the ids of one page of matching products
+    (best match first), the total number of matches after the category
+    filters, and facet counts.
+
+    Facets are computed before the category/subcategory filters so clients
+    can offer the other choices.
+    """
+    if connection.vendor == 'sqlite':
+        return _search_fts(query, owner, category, subcategory, limit, offset)
+    return _search_like(query, owner, category, subcategory, limit, offset)
+
+
+def _search_fts(query, owner, category, subcategory, limit, offset):
+    match = to_match_expression(query)
+    if not match:
+        return SearchResult([], 0, _facets([]))
+
+    params = [NAME_WEIGHT, DESCRIPTION_WEIGHT, match]
+    owner_filter = facet_filter = ''
+    if owner is not None:
+        owner_filter = 'AND p.created_by_id = %s'
+        params.append(owner.pk)
+    if category:
+        facet_filter += ' AND category = %s'
+        params.append(category)
+    if subcategory:
+        facet_filter += ' AND subcategory = %s'
+        params.append(subcategory)
+    params += [limit, offset]
+
+    sql = SEARCH_SQL.format(owner_filter=owner_filter, facet_filter=facet_filter)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    hits = sorted((rank, product_id) for kind, product_id, rank, _, _, _ in rows if kind == 'hit')
+    facet_rows = [(row[3], row[4], row[5]) for row in rows if row[0] == 'facet']
+    count = _count(facet_rows, category, subcategory)
+    return SearchResult([product_id for _, product_id in hits], count, _facets(facet_rows))
+
+
+def _search_like(query, owner, category, subcategory, limit, offset):
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return SearchResult([], 0, _facets([]))
+
+    queryset = Product.objects.all()
+    for term in terms:
+        queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+    if owner is not None:
+        queryset = queryset.filter(created_by=owner)
+    facet_rows = list(
+        queryset.order_by().values_list('category', 'subcategory').annotate(n=Count('id'))
+    )
+
+    if category:
+        queryset = queryset.filter(category=category)
+    if subcategory:
+        queryset = queryset.filter(subcategory=subcategory)
+    product_ids = list(
+        queryset.order_by('-created_at', '-id').values_list('id', flat=True)[offset:offset + limit]
+    )
+    count = _count(facet_rows, category, subcategory)
+    return SearchResult(product_ids, count, _facets(facet_rows))
+
+
+def _count(facet_rows, category, subcategory):
+    return sum(
+        n for row_category, row_subcategory, n in facet_rows
+        if (not category or row_category == category)
+        and (not subcategory or row_subcategory == subcategory)
+    )
+
+
+def _facets(rows):
+    facets = {'category': {}, 'subcategory': {}}
+    for category, subcategory, n in rows:
+        facets['category'][category] = facets['category'].get(category, 0) + n
+        facets['subcategory'][subcategory] = facets['subcategory'].get(subcategory, 0) + n
+    return facets
@@ -3,14 +3,64 @@ from .models import User, Product, CartItem, Order, OrderItem
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from .cart import apply_cart_operations
+from .images import ImageVariantsField
+from .reservations import claim_reservations, shortage_messages, take_stock
+from .sales import record_order_sales
+from .shopkeeper_orders import link_order_shopkeepers
+from sello.metrics import TimedSerializerMixin
+from jobs.queue import enqueue
 import re
 
 User = get_user_model()
 
-class LoginSerializer(serializers.Serializer):
+class EagerLoadingMixin:
+    """
+    Lets a serializer describe the relations it reads so views can load them
+    up front instead of once per object.
+
+    Nested serializer fields are picked up automatically (``many=True`` ones
+    are prefetched, the rest are joined); anything else can be listed in
+    ``select_related_fields`` / ``prefetch_related_fields``.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def get_related_lookups(cls, prefix=''):
+        select = [prefix + lookup for lookup in cls.select_related_fields]
+        prefetch = [prefix + lookup for lookup in cls.prefetch_related_fields]
+
+        for name, field in cls._declared_fields.items():
+            if not isinstance(field, serializers.BaseSerializer):
+                continue
+            many = isinstance(field, serializers.ListSerializer)
+            child = field.child if many else field
+            lookup = prefix + (field.source or name).replace('.', '__')
+            target = prefetch if many else select
+            target.append(lookup)
+            if isinstance(child, EagerLoadingMixin):
+                child_select, child_prefetch = child.get_related_lookups(lookup + '__')
+                target.extend(child_select)
+                prefetch.extend(child_prefetch)
+
+        return list(dict.fromkeys(select)), list(dict.fromkeys(prefetch))
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select, prefetch = cls.get_related_lookups()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+class CredentialsSerializer(serializers.Serializer):
     email = serializers.EmailField(required=True)
     password = serializers.CharField(required=True, write_only=True)
 
+class LoginSerializer(CredentialsSerializer):
     def validate(self, attrs):
         email = attrs.get('email')
         password = attrs.get('password')
@@ -33,7 +83,7 @@ class LoginSerializer(serializers.Serializer):
         attrs['user'] = user
         return attrs
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
     confirm_password = serializers.CharField(write_only=True, required=True)
 
@@ -139,14 +189,20 @@ class UserSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     created_by_id = serializers.IntegerField(write_only=True, required=False)
+    image_variants = ImageVariantsField(source='image')
+    available_stock = serializers.IntegerField(read_only=True)
+
+    compiled_fields = {
+        'available_stock': (('stock', 'reserved_stock'), lambda stock, reserved_stock: stock - reserved_stock),
+    }
 
     class Meta:
         model = Product
         fields = ['id', 'name', 'description', 'price', 'category', 
-                 'subcategory', 'stock', 'image', 'created_at', 
+                 'subcategory', 'stock', 'available_stock', 'image', 'image_variants', 'created_at', 
                  'updated_at', 'created_by', 'created_by_id']
         read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
 
@@ -170,11 +226,8 @@ class ProductSerializer(serializers.ModelSerializer):
 
     def validate_subcategory(self, value):
         category = self.initial_data.get('category')
-        if category == 'Dairy':
-            valid_subcategories = ['Milk', 'Cheese', 'Butter', 'Yogurt', 'Paneer', 'Cream']
-        elif category == 'Grocery':
-            valid_subcategories = ['Rice', 'Pulses', 'Flour', 'Oil', 'Spices', 'Sugar', 'Salt']
-        else:
+        valid_subcategories = Product.SUBCATEGORY_CHOICES.get(category)
+        if valid_subcategories is None:
             raise serializers.ValidationError("Please select a category first.")
             
         if value not in valid_subcategories:
@@ -192,7 +245,44 @@ class ProductSerializer(serializers.ModelSerializer):
         validated_data['created_by'] = user
         return super().create(validated_data)
 
-class CartItemSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        """
+        Set ``stock`` with a guarded UPDATE, so it never drops below what
+        concurrent checkouts hold (``reserved_stock``), then save only the
+        other submitted fields; writing back the whole row could undo stock
+        taken meanwhile.
+        """
+        stock = validated_data.pop('stock', None)
+        with transaction.atomic():
+            if stock is not None:
+                updated = Product.objects.filter(pk=instance.pk, reserved_stock__lte=stock).update(stock=stock)
+                instance.refresh_from_db(fields=['stock', 'reserved_stock'])
+                if not updated:
+                    raise serializers.ValidationError({
+                        'stock': [f"{instance.reserved_stock} units are held by checkouts in progress."]
+                    })
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    """One row of a bulk product import; validates without touching the database."""
+
+    class Meta:
+        model = Product
+        fields = ['name', 'description', 'price', 'category', 'subcategory', 'stock']
+
+    def validate(self, attrs):
+        category, subcategory = attrs['category'], attrs['subcategory']
+        valid_subcategories = Product.SUBCATEGORY_CHOICES[category]
+        if subcategory not in valid_subcategories:
+            raise serializers.ValidationError({
+                'subcategory': f"Invalid subcategory for {category}. Choose from {', '.join(valid_subcategories)}"
+            })
+        return attrs
+
+class CartItemSerializer(TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
     product_id = serializers.IntegerField(write_only=True, required=False)
     total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -202,30 +292,55 @@ class CartItemSerializer(serializers.ModelSerializer):
         fields = ('id', 'product', 'product_id', 'quantity', 'total_price', 'added_at')
         read_only_fields = ('id', 'added_at')
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return super().setup_eager_loading(queryset).with_totals()
+
     def create(self, validated_data):
         user = self.context['request'].user
-        product_id = validated_data.pop('product_id')
-        product = Product.objects.get(id=product_id)
-        
-        cart_item, created = CartItem.objects.get_or_create(
-            user=user,
-            product=product,
-            defaults={'quantity': validated_data.get('quantity', 1)}
-        )
-        
-        if not created:
-            cart_item.quantity += validated_data.get('quantity', 1)
-            cart_item.save()
-            
-        return cart_item
+        product_id = validated_data.pop('product_id', None)
+        if product_id is None:
+            raise serializers.ValidationError({'product_id': "This field is required."})
+
+        apply_cart_operations(user, [
+            {'op': 'add', 'product_id': product_id, 'quantity': validated_data.get('quantity', 1)}
+        ])
+        return self.setup_eager_loading(CartItem.objects.filter(user=user)).get(product_id=product_id)
+
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'])
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, required=False)
+
+    def validate(self, attrs):
+        if attrs['op'] != 'remove' and 'quantity' not in attrs:
+            raise serializers.ValidationError({'quantity': "This field is required."})
+        if attrs['op'] == 'add' and attrs['quantity'] < 1:
+            raise serializers.ValidationError({'quantity': "Ensure this value is greater than or equal to 1."})
+        return attrs
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, value):
+        if len(value) > 500:
+            raise serializers.ValidationError("At most 500 operations per batch.")
+        return value
+
+class CartSummarySerializer(serializers.Serializer):
+    item_count = serializers.IntegerField()
+    units = serializers.IntegerField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+class OrderItemSerializer(TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    compiled_fields = {'total_price': (('quantity', 'price'), lambda quantity, price: quantity * price)}
 
-class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ('id', 'product', 'quantity', 'price', 'product_name', 'total_price')
         read_only_fields = ('id', 'price', 'product_name', 'total_price')
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(TimedSerializerMixin, EagerLoadingMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     
     class Meta:
@@ -234,30 +349,59 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'user', 'created_at', 'total_amount')
 
     def create(self, validated_data):
+        """
+        Turn the user's cart into an order as one atomic unit.
+
+        Stock held for the user by ``POST orders/checkout/`` is used first
+        and anything beyond it comes out of available stock, all in one
+        guarded UPDATE issued last (see ``users.reservations``), so the
+        product rows are only locked for the tail of the transaction. The
+        order items are written with ``bulk_create``; any shortfall rolls
+        the whole checkout back.
+        """
         user = self.context['request'].user
-        cart_items = CartItem.objects.filter(user=user)
-        
-        if not cart_items.exists():
-            raise serializers.ValidationError("Cart is empty")
-            
-        total_amount = sum(item.total_price for item in cart_items)
-        order = Order.objects.create(
-            user=user,
-            total_amount=total_amount,
-            shipping_address=validated_data['shipping_address']
-        )
-        
-        # Create order items from cart items
-        for cart_item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                quantity=cart_item.quantity,
-                price=cart_item.product.price,
-                product_name=cart_item.product.name
+
+        with transaction.atomic():
+            cart_items = list(CartItem.objects.filter(user=user).with_totals().order_by('id'))
+            if not cart_items:
+                raise serializers.ValidationError("Cart is empty")
+
+            quantities = {}
+            for cart_item in cart_items:
+                quantities[cart_item.product_id] = quantities.get(cart_item.product_id, 0) + cart_item.quantity
+
+            held = claim_reservations(user)
+            products = Product.objects.in_bulk([*quantities, *held])
+            shortages = shortage_messages(products, quantities, held)
+            if shortages:
+                raise serializers.ValidationError({'stock': shortages})
+
+            order = Order.objects.create(
+                user=user,
+                total_amount=sum(cart_item.total_price for cart_item in cart_items),
+                shipping_address=validated_data['shipping_address']
             )
-            
-        # Clear the cart
-        cart_items.delete()
-        
+
+            # Create order items from cart items
+            order_items = OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product=products[cart_item.product_id],
+                    quantity=cart_item.quantity,
+                    price=cart_item.unit_price,
+                    product_name=products[cart_item.product_id].name
+                )
+                for cart_item in cart_items
+            ])
+            record_order_sales(order_items)
+            link_order_shopkeepers(order, order_items)
+
+            # Clear the cart
+            CartItem.objects.filter(pk__in=[cart_item.pk for cart_item in cart_items]).delete()
+
+            # Status change and notifications run in the job worker, committed with the order.
+            enqueue('users.process_order', {'order_id': order.pk})
+
+            take_stock(products, quantities, held)
+
         return order
@@ -0,0 +1,61 @@
+"""
+The order-to-shopkeeper index.
+
+``OrderShopkeeper`` links an order to every shopkeeper who sold something in
+it, with the order's ``created_at`` copied in. A shopkeeper's orders, newest
+first, are then one range scan over ``(shopkeeper, created_at, order)``
+instead of a join through ``OrderItem`` and ``Product`` plus ``DISTINCT``,
+and the link outlives the products (``OrderItem.product`` is set NULL when
+one is deleted).
+
+Links are written at checkout by ``link_order_shopkeepers``; existing
+orders are backfilled by a migration and ``manage.py
+rebuild_order_shopkeepers``.
+"""
+from .dashboard import bump_dashboards
+from .models import Order, OrderItem, OrderShopkeeper
+
+# Key pagination on the link's index; its columns mirror Order's (created_at, id).
+ORDERING = ('-shopkeeper_links__created_at', '-shopkeeper_links__order')
+
+
+def shopkeeper_orders(shopkeeper):
+    """``shopkeeper``'s orders; order by ``ORDERING`` to scan the link index."""
+    return Order.objects.filter(shopkeeper_links__shopkeeper=shopkeeper)
+
+
+def link_order_shopkeepers(order, order_items):
+    """
+    Link ``order`` to the owners of its items' products. Must run inside
+    the transaction that created the items, with each item's ``product``
+    loaded.
+    """
+    shopkeeper_ids = {item.product.created_by_id for item in order_items if item.product is not None}
+    OrderShopkeeper.objects.bulk_create([
+        OrderShopkeeper(order=order, shopkeeper_id=shopkeeper_id, created_at=order.created_at)
+        for shopkeeper_id in shopkeeper_ids
+    ])
+    # Neither bulk_create here nor the items' sends post_save.
+    bump_dashboards(*shopkeeper_ids)
+
+
+def rebuild_order_shopkeepers(batch_size=1000):
+    """
+    Add any links missing for order history and return how many were
+    added. Lines whose product has since been deleted cannot be
+    attributed and are skipped.
+    """
+    before = OrderShopkeeper.objects.count()
+    rows = (
+        OrderItem.objects.filter(product__isnull=False)
+        .values_list('order_id', 'product__created_by_id', 'order__created_at')
+        .distinct().order_by('order_id').iterator(chunk_size=batch_size)
+    )
+    batch = []
+    for order_id, shopkeeper_id, created_at in rows:
+        batch.append(OrderShopkeeper(order_id=order_id, shopkeeper_id=shopkeeper_id, created_at=created_at))
+        if len(batch) >= batch_size:
+            OrderShopkeeper.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    OrderShopkeeper.objects.bulk_create(batch, ignore_conflicts=True)
+    return OrderShopkeeper.objects.count() - before
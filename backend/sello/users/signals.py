@@ -0,0 +1,86 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .authentication import principal_cache
+from .images import register_image_fields
+from .cache import catalog_cache, instance_scope, owner_scope, product_scopes, table_scope
+from .dashboard import bump_dashboards, cart_holders, order_audience
+from .models import CartItem, Order, OrderItem, OrderShopkeeper, Product, User
+
+register_image_fields(Product, 'image')
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    catalog_cache.bump(*product_scopes(Product, instance.pk, instance.created_by_id))
+
+
+@receiver(pre_delete, sender=Product)
+def touch_orders_of_deleted_product(sender, instance, **kwargs):
+    # Deleting the product nulls OrderItem.product with an UPDATE that sends
+    # no signal; moving the orders' updated_at changes their ETag and
+    # Last-Modified (OrderViewSet.get_etag_parts).
+    Order.objects.filter(pk__in=OrderItem.objects.filter(product_id=instance.pk).values('order_id')).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_shopkeeper_catalog(sender, instance, created, **kwargs):
+    # Product responses embed their creator, so a shopkeeper edit touches
+    # every cached product of theirs.
+    if created or not instance.is_shopkeeper:
+        return
+    product_ids = instance.products.values_list('pk', flat=True)
+    catalog_cache.bump(
+        owner_scope(Product, instance.pk),
+        table_scope(Product),
+        *[instance_scope(Product, pk) for pk in product_ids],
+    )
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_principal(sender, instance, **kwargs):
+    # Any save may change role, is_active or the password hash.
+    principal_cache.bump(instance_scope(User, instance.pk))
+
+
+
+# Dashboard receivers run on pre_delete, while the rows that tell whose
+# dashboards are affected (cart lines, order links) still exist.
+
+@receiver([post_save, pre_delete], sender=Product)
+def invalidate_product_dashboards(sender, instance, **kwargs):
+    # Carts embed the product; a delete also clears it from order items.
+    audience = [instance.created_by_id, *cart_holders([instance.pk])]
+    if kwargs['signal'] is pre_delete:
+        audience += order_audience(OrderItem.objects.filter(product_id=instance.pk).values('order_id'))
+    bump_dashboards(*audience)
+
+
+@receiver([post_save, pre_delete], sender=CartItem)
+def invalidate_cart_dashboard(sender, instance, **kwargs):
+    bump_dashboards(instance.user_id)
+
+
+@receiver([post_save, pre_delete], sender=Order)
+def invalidate_order_dashboards(sender, instance, **kwargs):
+    shopkeeper_ids = OrderShopkeeper.objects.filter(order_id=instance.pk).values_list('shopkeeper_id', flat=True)
+    bump_dashboards(instance.user_id, *shopkeeper_ids)
+
+
+@receiver([post_save, pre_delete], sender=OrderItem)
+def invalidate_order_item_dashboards(sender, instance, **kwargs):
+    bump_dashboards(*order_audience([instance.order_id]))
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_dashboards(sender, instance, created, **kwargs):
+    if created:
+        return
+    # A shopkeeper is embedded in their products, including in customers' carts.
+    audience = [instance.pk]
+    if instance.is_shopkeeper:
+        audience += cart_holders(instance.products.values('pk'))
+    bump_dashboards(*audience)
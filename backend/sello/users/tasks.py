@@ -0,0 +1,37 @@
+"""
+Background jobs for the users app, run by ``manage.py run_jobs``.
+"""
+import logging
+
+from django.utils import timezone
+
+from jobs.queue import register
+
+from .dashboard import bump_dashboards, order_audience
+from .models import Order
+from .reservations import release_reservations
+
+logger = logging.getLogger(__name__)
+
+
+@register('users.process_order')
+def process_order(order_id):
+    """Post-checkout follow-ups: notify, then move the order from PENDING to PROCESSING."""
+    order = Order.objects.select_related('user').filter(pk=order_id, status='PENDING').first()
+    if order is None:
+        # Processed by an earlier attempt, cancelled or deleted.
+        return
+    notify_order_placed(order)
+    if Order.objects.filter(pk=order.pk, status='PENDING').update(status='PROCESSING', updated_at=timezone.now()):
+        bump_dashboards(*order_audience([order.pk]))
+
+
+def notify_order_placed(order):
+    """Stand-in for customer and shopkeeper notifications (email, push)."""
+    logger.info("Order %s placed by %s for %s", order.pk, order.user.email, order.total_amount)
+
+
+@register('users.release_expired_reservations')
+def release_expired_reservations():
+    """Give back the stock of checkout holds that ran out unused."""
+    release_reservations(expired=True)
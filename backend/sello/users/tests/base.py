@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import principal_cache
+from users.blacklist import token_blacklist
+from users.cache import catalog_cache
+from users.dashboard import dashboard_cache
+from users.models import Product, User
+
+
+class APITestCase(TestCase):
+    """Starts every test with empty caches, so nothing cached survives a rolled-back test."""
+
+    def setUp(self):
+        self.clear_caches()
+
+    def clear_caches(self):
+        cache.clear()
+        for versioned in (catalog_cache, dashboard_cache, principal_cache):
+            versioned.local.clear()
+        token_blacklist._filter = None
+
+    def make_user(self, email, role='CUSTOMER'):
+        return User.objects.create_user(email=email, password='Str0ng-pass!', role=role)
+
+    def make_product(self, owner, name='Milk', price='2.00', stock=10, description='Fresh milk'):
+        return Product.objects.create(
+            name=name, description=description, price=price, category='Dairy', subcategory='Milk',
+            stock=stock, created_by=owner,
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
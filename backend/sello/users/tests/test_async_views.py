@@ -0,0 +1,74 @@
+import json
+
+from django.contrib.auth.hashers import make_password
+from django.test import AsyncRequestFactory, TestCase
+
+from users.async_views import sign_in, sign_up
+from users.models import User
+
+
+class AsyncAuthViewTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create_user(email='customer@example.com', password='Str0ng-pass!')
+
+    async def post(self, view, data):
+        body = data if isinstance(data, str) else json.dumps(data)
+        response = await view(self.factory.post('/', body, content_type='application/json'))
+        return response.status_code, json.loads(response.content)
+
+    async def test_sign_in_issues_tokens(self):
+        status, data = await self.post(sign_in, {'email': 'customer@example.com', 'password': 'Str0ng-pass!'})
+        self.assertEqual(status, 200)
+        self.assertEqual(data['user']['id'], self.user.pk)
+        self.assertTrue(data['access'] and data['refresh'])
+
+    async def test_sign_in_email_is_case_insensitive(self):
+        status, data = await self.post(sign_in, {'email': 'Customer@Example.COM', 'password': 'Str0ng-pass!'})
+        self.assertEqual(status, 200)
+        self.assertEqual(data['user']['email'], 'customer@example.com')
+
+    async def test_wrong_password_and_unknown_email_fail_alike(self):
+        expected = {'non_field_errors': ['Invalid email or password.']}
+        self.assertEqual(
+            await self.post(sign_in, {'email': 'customer@example.com', 'password': 'wrong'}), (400, expected),
+        )
+        self.assertEqual(
+            await self.post(sign_in, {'email': 'nobody@example.com', 'password': 'Str0ng-pass!'}), (400, expected),
+        )
+
+    async def test_inactive_user_cannot_sign_in(self):
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        status, _ = await self.post(sign_in, {'email': 'customer@example.com', 'password': 'Str0ng-pass!'})
+        self.assertEqual(status, 400)
+
+    async def test_malformed_json_is_rejected(self):
+        self.assertEqual(await self.post(sign_in, '{"email": '), (400, {'detail': 'JSON parse error.'}))
+        self.assertEqual(await self.post(sign_up, '{"email": '), (400, {'detail': 'JSON parse error.'}))
+
+    async def test_outdated_hash_is_upgraded_on_sign_in(self):
+        old = make_password('Str0ng-pass!', hasher='pbkdf2_sha1')
+        await User.objects.filter(pk=self.user.pk).aupdate(password=old)
+        status, _ = await self.post(sign_in, {'email': 'customer@example.com', 'password': 'Str0ng-pass!'})
+        self.assertEqual(status, 200)
+        user = await User.objects.aget(pk=self.user.pk)
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertTrue(user.check_password('Str0ng-pass!'))
+
+    async def test_sign_up_creates_user(self):
+        status, data = await self.post(sign_up, {
+            'email': 'New@Example.com', 'password': 'Str0ng-pass!', 'confirm_password': 'Str0ng-pass!',
+            'first_name': 'Ada', 'last_name': 'Lovelace', 'role': 'SHOPKEEPER',
+        })
+        self.assertEqual(status, 201)
+        self.assertEqual((data['user']['email'], data['user']['role']), ('new@example.com', 'SHOPKEEPER'))
+        user = await User.objects.aget(email='new@example.com')
+        self.assertTrue(user.check_password('Str0ng-pass!'))
+
+    async def test_sign_up_rejects_taken_email(self):
+        status, data = await self.post(sign_up, {
+            'email': 'customer@example.com', 'password': 'Str0ng-pass!', 'confirm_password': 'Str0ng-pass!',
+            'first_name': 'Ada', 'last_name': 'Lovelace',
+        })
+        self.assertEqual(status, 400)
+        self.assertIn('email', data)
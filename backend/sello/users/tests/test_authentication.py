@@ -0,0 +1,48 @@
+from unittest import mock
+
+from rest_framework_simplejwt.settings import api_settings
+
+from users.authentication import principal_cache
+
+from .base import APITestCase
+
+
+class CachedPrincipalTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user('customer@example.com')
+        self.client = self.client_for(self.user)
+
+    def dashboard(self):
+        return self.client.get('/users/dashboard/')
+
+    def test_principal_is_cached_between_requests(self):
+        self.assertEqual(self.dashboard().status_code, 200)
+        self.assertEqual(principal_cache.stats()['local_entries'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.dashboard().status_code, 200)
+
+    def test_deactivation_takes_effect_on_the_next_request(self):
+        self.assertEqual(self.dashboard().status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.dashboard().status_code, 401)
+
+    def test_role_change_takes_effect_on_the_next_request(self):
+        self.assertIn('total_orders', self.dashboard().json())
+        self.user.role = 'SHOPKEEPER'
+        self.user.save()
+        self.assertIn('total_sales', self.dashboard().json())
+
+    def test_deleted_user_is_rejected(self):
+        self.assertEqual(self.dashboard().status_code, 200)
+        self.user.delete()
+        self.assertEqual(self.dashboard().status_code, 401)
+
+    def test_password_change_revokes_tokens_when_checked(self):
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True):
+            self.client = self.client_for(self.user)
+            self.assertEqual(self.dashboard().status_code, 200)
+            self.user.set_password('An0ther-pass!')
+            self.user.save()
+            self.assertEqual(self.dashboard().status_code, 401)
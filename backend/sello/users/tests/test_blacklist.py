@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from users.blacklist import RefreshToken, TokenBlacklist, token_blacklist
+
+from .base import APITestCase
+
+
+class TokenBlacklistTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user('customer@example.com')
+
+    def refresh(self, token):
+        return self.client.post('/users/token/refresh/', {'refresh': str(token)}, format='json')
+
+    def blacklist_row(self, jti, pk=None):
+        outstanding = OutstandingToken.objects.create(
+            user=self.user, jti=jti, token='x', expires_at=timezone.now() + timedelta(days=1),
+        )
+        return BlacklistedToken.objects.create(pk=pk, token=outstanding)
+
+    def test_rotated_refresh_token_cannot_be_replayed(self):
+        token = RefreshToken.for_user(self.user)
+        first = self.refresh(token)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('refresh', first.json())
+        self.assertEqual(self.refresh(token).status_code, 401)
+        self.assertEqual(self.refresh(first.json()['refresh']).status_code, 200)
+
+    def test_unknown_token_is_answered_without_a_query(self):
+        token_blacklist.sync()
+        with self.assertNumQueries(0):
+            self.assertFalse(token_blacklist.contains('never-issued'))
+
+    def test_rows_written_elsewhere_are_loaded(self):
+        blacklist = TokenBlacklist(sync_interval=0)
+        self.assertFalse(blacklist.contains('elsewhere'))
+        self.blacklist_row('elsewhere')
+        self.assertTrue(blacklist.contains('elsewhere'))
+
+    def test_rebuild_catches_rows_committed_out_of_id_order(self):
+        blacklist = TokenBlacklist(sync_interval=0, rebuild_interval=3600)
+        self.blacklist_row('late-commit-high', pk=1000)
+        self.assertTrue(blacklist.contains('late-commit-high'))
+        # A row with an id far below what was already loaded.
+        self.blacklist_row('late-commit-low', pk=1)
+        self.assertFalse(blacklist.contains('late-commit-low'))
+
+        blacklist._rebuilt_at -= blacklist.rebuild_interval
+        self.assertTrue(blacklist.contains('late-commit-low'))
+
+    def test_invalidate_drops_purged_tokens(self):
+        blacklist = TokenBlacklist(sync_interval=0)
+        row = self.blacklist_row('purged')
+        self.assertTrue(blacklist.contains('purged'))
+        row.token.delete()
+        blacklist.invalidate()
+        blacklist.sync()
+        self.assertNotIn('purged', blacklist._filter)
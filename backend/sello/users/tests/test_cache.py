@@ -0,0 +1,127 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from users.cache import VersionedCache
+
+from .base import APITestCase
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = VersionedCache('test', single_flight=True, lease_timeout=5, lease_poll=0.01)
+
+    def run_threads(self, *targets):
+        threads = [threading.Thread(target=target) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+    def test_concurrent_misses_compute_once(self):
+        calls, results = [], []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'value': 1}
+
+        self.run_threads(*[lambda: results.append(self.cache.get_or_set('k', ['s'], compute))] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'value': 1}] * 8)
+        self.assertEqual(self.cache._flights, {})
+
+    def test_misses_on_other_keys_do_not_wait(self):
+        release = threading.Event()
+        finished = []
+
+        def slow():
+            release.wait(5)
+            return 'slow'
+
+        slow_thread = threading.Thread(target=lambda: self.cache.get_or_set('slow', ['s'], slow))
+        slow_thread.start()
+        try:
+            for i in range(64):
+                self.cache.get_or_set(f'fast{i}', ['s'], lambda: 'fast')
+                finished.append(i)
+        finally:
+            release.set()
+            slow_thread.join(5)
+        self.assertEqual(len(finished), 64)
+
+    def test_waits_for_a_lease_held_elsewhere(self):
+        key = self.cache._entry_key('k', ['s'])
+        cache.add(f'{key}:lease', 1, 5)
+
+        def other_process():
+            time.sleep(0.1)
+            cache.set(key, 'theirs', 60)
+            cache.delete(f'{key}:lease')
+
+        thread = threading.Thread(target=other_process)
+        thread.start()
+        value = self.cache.get_or_set('k', ['s'], lambda: 'ours')
+        thread.join(5)
+        self.assertEqual(value, 'theirs')
+
+
+class CatalogInvalidationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+        self.product = self.make_product(self.shopkeeper)
+
+    def test_product_update_refreshes_cached_list_and_detail(self):
+        client = self.client_for(self.customer)
+        url = f'/users/products/{self.product.pk}/'
+        self.assertEqual(client.get('/users/products/').data['results'][0]['name'], 'Milk')
+        self.assertEqual(client.get(url).data['name'], 'Milk')
+
+        response = self.client_for(self.shopkeeper).patch(url, {'name': 'Oat milk'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get('/users/products/').data['results'][0]['name'], 'Oat milk')
+        self.assertEqual(client.get(url).data['name'], 'Oat milk')
+
+    def test_new_product_shows_in_cached_list(self):
+        client = self.client_for(self.customer)
+        self.assertEqual(len(client.get('/users/products/').data['results']), 1)
+        self.make_product(self.shopkeeper, name='Butter')
+        self.assertEqual(len(client.get('/users/products/').data['results']), 2)
+
+
+class DashboardInvalidationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+        self.product = self.make_product(self.shopkeeper)
+
+    def test_cart_change_refreshes_cached_dashboard(self):
+        client = self.client_for(self.customer)
+        self.assertEqual(client.get('/users/dashboard/').data['cart_items'], [])
+
+        response = client.post('/users/cart/', {'product_id': self.product.pk, 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, 201)
+        dashboard = client.get('/users/dashboard/').data
+        self.assertEqual(len(dashboard['cart_items']), 1)
+        self.assertEqual(dashboard['cart_total'], Decimal('4.00'))
+
+        client.post('/users/cart/batch/', {'operations': [{'op': 'remove', 'product_id': self.product.pk}]},
+                    format='json')
+        self.assertEqual(client.get('/users/dashboard/').data['cart_items'], [])
+
+    def test_price_change_refreshes_dashboards_of_cart_holders(self):
+        client = self.client_for(self.customer)
+        client.post('/users/cart/', {'product_id': self.product.pk, 'quantity': 2}, format='json')
+        self.assertEqual(client.get('/users/dashboard/').data['cart_total'], Decimal('4.00'))
+
+        self.client_for(self.shopkeeper).patch(f'/users/products/{self.product.pk}/', {'price': '3.00'},
+                                               format='json')
+        self.assertEqual(client.get('/users/dashboard/').data['cart_total'], Decimal('6.00'))
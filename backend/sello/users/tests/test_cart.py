@@ -0,0 +1,125 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+from users.cart import merge_operations
+from users.models import CartItem
+
+from .base import APITestCase
+
+
+class CartTotalsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+        self.client = self.client_for(self.customer)
+        for name, price, quantity in (('Milk', '0.10', 3), ('Curd', '0.20', 3), ('Ghee', '19.99', 3)):
+            CartItem.objects.create(user=self.customer, product=self.make_product(self.shopkeeper, name, price), quantity=quantity)
+
+    def test_summary_counts_lines_units_and_total(self):
+        with self.assertNumQueries(1):
+            summary = CartItem.objects.filter(user=self.customer).summary()
+        self.assertEqual(summary, {'item_count': 3, 'units': 9, 'total': Decimal('60.87')})
+
+        response = self.client.get('/users/cart/summary/')
+        self.assertEqual(response.json(), {'item_count': 3, 'units': 9, 'total': '60.87'})
+
+    def test_empty_cart_summary(self):
+        CartItem.objects.all().delete()
+        self.assertEqual(self.client.get('/users/cart/summary/').json(), {'item_count': 0, 'units': 0, 'total': '0.00'})
+
+    def test_line_totals_are_computed_in_sql_to_the_cent(self):
+        items = list(CartItem.objects.filter(user=self.customer).with_totals().order_by('id'))
+        with self.assertNumQueries(0):
+            totals = [item.total_price for item in items]
+        self.assertEqual([str(total) for total in totals], ['0.30', '0.60', '59.97'])
+
+    def test_dashboard_reads_the_cart_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/users/dashboard/')
+        self.assertEqual(sum('FROM "users_cartitem"' in query['sql'] for query in queries), 1)
+        self.assertEqual(response.json()['cart_total'], 60.87)
+        self.assertEqual(sorted(item['total_price'] for item in response.json()['cart_items']), ['0.30', '0.60', '59.97'])
+
+
+class MergeOperationsTests(SimpleTestCase):
+    def merge(self, *operations):
+        return merge_operations([dict(zip(('op', 'product_id', 'quantity'), operation)) for operation in operations])
+
+    def test_adds_accumulate(self):
+        self.assertEqual(self.merge(('add', 1, 2), ('add', 1, 3)), {1: ('add', 5)})
+
+    def test_add_after_set_raises_the_set(self):
+        self.assertEqual(self.merge(('set', 1, 2), ('add', 1, 3)), {1: ('set', 5)})
+
+    def test_add_after_remove_becomes_a_set(self):
+        self.assertEqual(self.merge(('remove', 1), ('add', 1, 3)), {1: ('set', 3)})
+
+    def test_last_set_or_remove_wins(self):
+        self.assertEqual(self.merge(('add', 1, 2), ('set', 1, 7)), {1: ('set', 7)})
+        self.assertEqual(self.merge(('add', 1, 2), ('remove', 1)), {1: ('remove', 0)})
+
+    def test_set_to_zero_is_a_remove(self):
+        self.assertEqual(self.merge(('set', 1, 0)), {1: ('remove', 0)})
+        self.assertEqual(self.merge(('set', 1, 0), ('add', 1, 2)), {1: ('set', 2)})
+
+    def test_products_are_merged_independently(self):
+        self.assertEqual(self.merge(('add', 1, 1), ('set', 2, 4), ('add', 1, 1)), {1: ('add', 2), 2: ('set', 4)})
+
+
+class CartBatchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+        self.client = self.client_for(self.customer)
+        self.milk = self.make_product(shopkeeper, 'Milk')
+        self.curd = self.make_product(shopkeeper, 'Curd')
+
+    def batch(self, *operations):
+        return self.client.post('/users/cart/batch/', {'operations': list(operations)}, format='json')
+
+    def quantities(self):
+        return dict(CartItem.objects.filter(user=self.customer).values_list('product_id', 'quantity'))
+
+    def test_applies_merged_operations(self):
+        CartItem.objects.create(user=self.customer, product=self.curd, quantity=5)
+        response = self.batch(
+            {'op': 'add', 'product_id': self.milk.pk, 'quantity': 1},
+            {'op': 'add', 'product_id': self.milk.pk, 'quantity': 2},
+            {'op': 'add', 'product_id': self.curd.pk, 'quantity': 1},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities(), {self.milk.pk: 3, self.curd.pk: 6})
+        self.assertEqual(sorted(item['quantity'] for item in response.json()['items']), [3, 6])
+
+    def test_set_replaces_and_remove_deletes(self):
+        CartItem.objects.create(user=self.customer, product=self.milk, quantity=5)
+        CartItem.objects.create(user=self.customer, product=self.curd, quantity=5)
+        self.batch({'op': 'set', 'product_id': self.milk.pk, 'quantity': 2},
+                   {'op': 'remove', 'product_id': self.curd.pk})
+        self.assertEqual(self.quantities(), {self.milk.pk: 2})
+
+    def test_set_to_zero_deletes_the_line(self):
+        CartItem.objects.create(user=self.customer, product=self.milk, quantity=5)
+        response = self.batch({'op': 'set', 'product_id': self.milk.pk, 'quantity': 0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities(), {})
+
+    def test_add_of_zero_is_rejected(self):
+        response = self.batch({'op': 'add', 'product_id': self.milk.pk, 'quantity': 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_product_rejects_the_whole_batch(self):
+        CartItem.objects.create(user=self.customer, product=self.curd, quantity=5)
+        response = self.batch(
+            {'op': 'add', 'product_id': self.milk.pk, 'quantity': 1},
+            {'op': 'remove', 'product_id': self.curd.pk},
+            {'op': 'set', 'product_id': 999999, 'quantity': 1},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'product_id': ['Product 999999 does not exist.']})
+        self.assertEqual(self.quantities(), {self.curd.pk: 5})
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobs.models import Job
+from users.models import CartItem, Order, OrderItem, Product, StockReservation
+from users.reservations import release_reservations
+
+from .base import APITestCase
+
+
+class CheckoutTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+        self.client = self.client_for(self.customer)
+        self.milk = self.make_product(self.shopkeeper, name='Milk', price='2.50', stock=5)
+        self.cheese = self.make_product(self.shopkeeper, name='Cheese', price='7.00', stock=2)
+
+    def add_to_cart(self, product, quantity):
+        response = self.client.post('/users/cart/batch/', {
+            'operations': [{'op': 'add', 'product_id': product.pk, 'quantity': quantity}],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def place_order(self):
+        return self.client.post('/users/orders/', {'shipping_address': '1 Main St'}, format='json')
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock, product.reserved_stock
+
+    def test_places_order_and_takes_stock(self):
+        self.add_to_cart(self.milk, 2)
+        self.add_to_cart(self.cheese, 1)
+        response = self.place_order()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['total_amount'], '12.00')
+
+        order = Order.objects.get()
+        self.assertEqual(sorted(order.items.values_list('product_name', 'quantity')), [('Cheese', 1), ('Milk', 2)])
+        self.assertEqual(self.stock(self.milk), (3, 0))
+        self.assertEqual(self.stock(self.cheese), (1, 0))
+        self.assertFalse(CartItem.objects.filter(user=self.customer).exists())
+        self.assertTrue(Job.objects.filter(name='users.process_order', payload={'order_id': order.pk}).exists())
+
+    def test_shortage_rolls_back_everything(self):
+        self.add_to_cart(self.milk, 2)
+        self.add_to_cart(self.cheese, 3)
+        response = self.place_order()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('stock', response.json())
+
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertEqual(self.stock(self.milk), (5, 0))
+        self.assertEqual(self.stock(self.cheese), (2, 0))
+        self.assertEqual(CartItem.objects.filter(user=self.customer).count(), 2)
+
+    def test_stock_guard_rejects_what_another_checkout_took(self):
+        self.add_to_cart(self.cheese, 2)
+        # Sold elsewhere after the cart was filled.
+        Product.objects.filter(pk=self.cheese.pk).update(stock=1)
+        self.assertEqual(self.place_order().status_code, 400)
+        self.assertEqual(self.stock(self.cheese), (1, 0))
+
+    def test_reservation_holds_stock_from_other_customers(self):
+        self.add_to_cart(self.cheese, 2)
+        response = self.client.post('/users/orders/checkout/')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stock(self.cheese), (2, 2))
+
+        other = self.make_user('other@example.com')
+        CartItem.objects.create(user=other, product=self.cheese, quantity=1)
+        other_response = self.client_for(other).post('/users/orders/', {'shipping_address': 'x'}, format='json')
+        self.assertEqual(other_response.status_code, 400)
+
+        self.assertEqual(self.place_order().status_code, 201)
+        self.assertEqual(self.stock(self.cheese), (0, 0))
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_cancelled_reservation_gives_stock_back(self):
+        self.add_to_cart(self.milk, 3)
+        self.client.post('/users/orders/checkout/')
+        self.assertEqual(self.stock(self.milk), (5, 3))
+        self.assertEqual(self.client.delete('/users/orders/checkout/').status_code, 204)
+        self.assertEqual(self.stock(self.milk), (5, 0))
+
+    def test_expired_reservations_are_released(self):
+        self.add_to_cart(self.milk, 3)
+        self.client.post('/users/orders/checkout/')
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(release_reservations(expired=True), 1)
+        self.assertEqual(self.stock(self.milk), (5, 0))
+
+    def test_checkout_releases_own_expired_holds_without_a_worker(self):
+        self.add_to_cart(self.milk, 5)
+        self.client.post('/users/orders/checkout/')
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        # The expired hold still counts against available stock until released.
+        response = self.place_order()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stock(self.milk), (0, 0))
+        self.assertFalse(StockReservation.objects.exists())
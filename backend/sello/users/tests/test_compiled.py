@@ -0,0 +1,69 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from users.compiled import ValuesSerializer
+from users.models import Order, OrderItem, Product
+from users.serializers import OrderSerializer, ProductSerializer
+
+from .base import APITestCase
+
+
+class ValuesSerializerTests(APITestCase):
+    """``ValuesSerializer`` must render exactly what the DRF serializer does."""
+
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.shopkeeper.phone = '+15550100'
+        self.shopkeeper.save()
+        no_phone = self.make_user('nophone@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+
+        self.milk = self.make_product(self.shopkeeper, 'Milk')
+        Product.objects.filter(pk=self.milk.pk).update(image='products/milk.png')
+        self.curd = self.make_product(no_phone, 'Curd', price='3.50', stock=0)
+        deleted = self.make_product(self.shopkeeper, 'Ghee')
+
+        order = Order.objects.create(user=self.customer, total_amount='12.00', shipping_address='1 Main St')
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=self.milk, quantity=2, price='2.00', product_name='Milk'),
+            OrderItem(order=order, product=deleted, quantity=1, price='8.00', product_name='Ghee'),
+        ])
+        Order.objects.create(user=self.customer, total_amount='0.00', shipping_address='1 Main St')
+        deleted.delete()
+
+    def assert_same_output(self, serializer_class, queryset, context):
+        queryset = queryset.order_by('id')
+        expected = serializer_class(serializer_class.setup_eager_loading(queryset), many=True, context=context).data
+        compiled = ValuesSerializer(serializer_class, context=context)
+        actual = compiled.to_representation(compiled.get_queryset(queryset))
+        self.assertEqual(actual, expected)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def contexts(self):
+        request = APIRequestFactory().get('/users/products/')
+        return [{}, {'request': request}]
+
+    def test_products(self):
+        for context in self.contexts():
+            with self.subTest(request='request' in context):
+                self.assert_same_output(ProductSerializer, Product.objects.all(), context)
+
+    def test_products_cover_images_and_null_phones(self):
+        data = ProductSerializer(Product.objects.order_by('id'), many=True).data
+        self.assertIsNotNone(data[0]['image_variants'])
+        self.assertIsNone(data[1]['image_variants'])
+        self.assertIsNone(data[1]['created_by']['phone'])
+
+    def test_orders(self):
+        for context in self.contexts():
+            with self.subTest(request='request' in context):
+                self.assert_same_output(OrderSerializer, Order.objects.all(), context)
+
+    def test_orders_cover_deleted_products(self):
+        data = OrderSerializer(Order.objects.order_by('id'), many=True).data
+        self.assertEqual([item['product'] for item in data[0]['items']], [self.milk.pk, None])
+        self.assertEqual(data[1]['items'], [])
+
+    def test_empty_queryset(self):
+        self.assert_same_output(ProductSerializer, Product.objects.none(), {})
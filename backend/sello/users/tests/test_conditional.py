@@ -0,0 +1,77 @@
+from users.models import Order, OrderItem
+
+from .base import APITestCase
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+        self.client = self.client_for(self.customer)
+        self.product = self.make_product(self.shopkeeper)
+        self.order = Order.objects.create(user=self.customer, total_amount='2.00', shipping_address='1 Main St')
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=1, price='2.00', product_name='Milk')
+
+    def assert_not_modified(self, url, etag, client=None):
+        response = (client or self.client).get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def assert_modified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    def test_matching_etag_is_not_modified(self):
+        for url in ('/users/products/', f'/users/products/{self.product.pk}/', '/users/orders/',
+                    f'/users/orders/{self.order.pk}/'):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Authorization', response['Vary'])
+                self.assert_not_modified(url, response['ETag'])
+
+    def test_product_write_changes_the_etag(self):
+        url = f'/users/products/{self.product.pk}/'
+        etag = self.client.get(url)['ETag']
+        list_etag = self.client.get('/users/products/')['ETag']
+        self.product.price = '3.00'
+        self.product.save()
+        self.assertEqual(self.assert_modified(url, etag).json()['price'], '3.00')
+        self.assert_modified('/users/products/', list_etag)
+
+    def test_order_write_changes_the_etag(self):
+        url = f'/users/orders/{self.order.pk}/'
+        etag = self.client.get(url)['ETag']
+        list_etag = self.client.get('/users/orders/')['ETag']
+        self.order.status = 'SHIPPED'
+        self.order.save()
+        self.assertEqual(self.assert_modified(url, etag).json()['status'], 'SHIPPED')
+        self.assert_modified('/users/orders/', list_etag)
+
+    def test_new_order_changes_the_list_etag(self):
+        etag = self.client.get('/users/orders/')['ETag']
+        Order.objects.create(user=self.customer, total_amount='0.00', shipping_address='1 Main St')
+        self.assert_modified('/users/orders/', etag)
+
+    def test_deleting_a_product_changes_its_orders_etag(self):
+        url = f'/users/orders/{self.order.pk}/'
+        etag = self.client.get(url)['ETag']
+        list_etag = self.client.get('/users/orders/')['ETag']
+        self.product.delete()
+        self.assertIsNone(self.assert_modified(url, etag).json()['items'][0]['product'])
+        self.assert_modified('/users/orders/', list_etag)
+
+    def test_etag_varies_per_user(self):
+        other = self.client_for(self.make_user('other@example.com'))
+        mine, theirs = self.client.get('/users/products/')['ETag'], other.get('/users/products/')['ETag']
+        self.assertNotEqual(mine, theirs)
+        self.assertEqual(other.get('/users/products/', HTTP_IF_NONE_MATCH=mine).status_code, 200)
+
+    def test_etag_varies_per_url(self):
+        etag = self.client.get('/users/products/')['ETag']
+        response = self.client.get('/users/products/', {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
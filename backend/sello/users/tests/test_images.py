@@ -0,0 +1,39 @@
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase
+from PIL import Image
+
+from users.images import generate_variants, get_variants, variant_name
+
+
+class ImageVariantTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = FileSystemStorage(location=directory.name)
+
+    def save_image(self, name, color, format):
+        buffer = BytesIO()
+        Image.new('RGB', (1000, 500), color).save(buffer, format=format)
+        return self.storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_originals_differing_only_in_extension_get_separate_variants(self):
+        self.assertNotEqual(variant_name('products/milk.png', 'thumb'), variant_name('products/milk.jpg', 'thumb'))
+
+    def test_generates_every_configured_variant_within_bounds(self):
+        png = self.save_image('products/milk.png', 'red', 'PNG')
+        jpg = self.save_image('products/milk.jpg', 'blue', 'JPEG')
+        generate_variants(self.storage, png)
+        generate_variants(self.storage, jpg)
+
+        for variant, spec in get_variants().items():
+            with self.storage.open(variant_name(png, variant)) as f:
+                image = Image.open(f)
+                self.assertLessEqual(image.width, spec['size'][0])
+                self.assertLessEqual(image.height, spec['size'][1])
+                self.assertGreater(image.convert('RGB').getpixel((0, 0))[0], 200)
+            with self.storage.open(variant_name(jpg, variant)) as f:
+                self.assertGreater(Image.open(f).convert('RGB').getpixel((0, 0))[2], 200)
@@ -0,0 +1,64 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from users.imports import CSV, ProductImporter, get_checkpoint, read_rows
+from users.models import Product, ProductImport
+
+from .base import APITestCase
+
+HEADER = 'name,description,price,category,subcategory,stock\n'
+
+
+def csv_file(count, name='products.csv'):
+    rows = ''.join(f'Milk {i},Fresh,2.00,Dairy,Milk,5\n' for i in range(1, count + 1))
+    return SimpleUploadedFile(name, (HEADER + rows).encode(), content_type='text/csv')
+
+
+class ProductImportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.client = self.client_for(self.shopkeeper)
+
+    def upload(self, file, **data):
+        return self.client.post('/users/products/import/', {'file': file, **data}, format='multipart')
+
+    def test_checkpoint_survives_an_interrupted_import(self):
+        checkpoint = get_checkpoint(self.shopkeeper, 'batch-1')
+
+        def interrupted(rows):
+            for row_number, data in rows:
+                if row_number == 4:
+                    raise ConnectionError('client went away')
+                yield row_number, data
+
+        with self.assertRaises(ConnectionError):
+            ProductImporter(self.shopkeeper, chunk_size=2, checkpoint=checkpoint).run(
+                interrupted(read_rows(csv_file(5), CSV))
+            )
+        checkpoint.refresh_from_db()
+        self.assertEqual((checkpoint.next_row, checkpoint.created, checkpoint.finished), (3, 2, False))
+
+        response = self.upload(csv_file(5), import_id='batch-1')
+        self.assertEqual(response.json()['start_row'], 3)
+        self.assertEqual(response.json()['created'], 3)
+        self.assertEqual(
+            sorted(Product.objects.values_list('name', flat=True)), [f'Milk {i}' for i in range(1, 6)]
+        )
+
+    def test_reposting_a_finished_file_imports_nothing(self):
+        first = self.upload(csv_file(3)).json()
+        self.assertEqual(first['created'], 3)
+        again = self.upload(csv_file(3)).json()
+        self.assertTrue(again['finished'])
+        self.assertEqual(again['import_id'], first['import_id'])
+        self.assertEqual(Product.objects.count(), 3)
+
+        progress = self.client.get('/users/products/import/', {'import_id': first['import_id']}).json()
+        self.assertEqual((progress['next_row'], progress['created'], progress['finished']), (4, 3, True))
+
+    def test_invalid_rows_are_reported_and_counted(self):
+        file = SimpleUploadedFile('p.csv', (HEADER + 'Milk,Fresh,-1,Dairy,Milk,5\nCurd,Fresh,1.00,Dairy,Yogurt,2\n').encode())
+        report = self.upload(file).json()
+        self.assertEqual((report['created'], report['failed']), (1, 1))
+        self.assertEqual(report['errors'][0]['row'], 1)
+        self.assertEqual(ProductImport.objects.get().failed, 1)
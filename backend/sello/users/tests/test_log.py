@@ -0,0 +1,118 @@
+import io
+import json
+import logging
+
+from django.test import SimpleTestCase, TestCase
+
+from sello.log import REDACTED, JSONFormatter, QueueHandler, SamplingFilter, redact
+from sello.metrics import collect
+
+
+def make_record(msg='message', args=(), level=logging.INFO, name='users.views', **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class RedactionTests(SimpleTestCase):
+    def format(self, record):
+        return json.loads(JSONFormatter().format(record))
+
+    def test_redacts_sensitive_keys_at_any_depth(self):
+        value = {
+            'email': 'a@example.com',
+            'password': 'hunter2',
+            'headers': {'Authorization': 'Bearer abc', 'Accept': 'application/json'},
+            'items': [{'card_number': '4242'}, ({'refresh': 'r'},)],
+            1: 'non-string key',
+        }
+        self.assertEqual(redact(value), {
+            'email': 'a@example.com',
+            'password': REDACTED,
+            'headers': {'Authorization': REDACTED, 'Accept': 'application/json'},
+            'items': [{'card_number': REDACTED}, ({'refresh': REDACTED},)],
+            1: 'non-string key',
+        })
+        self.assertEqual(value['password'], 'hunter2')
+
+    def test_redacts_mapping_args(self):
+        record = make_record('Login with %(email)s / %(password)s', ({'email': 'a@example.com', 'password': 'x'},))
+        self.assertEqual(self.format(record)['message'], f'Login with a@example.com / {REDACTED}')
+
+    def test_redacts_dicts_inside_positional_args(self):
+        data = {'email': 'a@example.com', 'confirm_password': 'hunter2', 'tokens': {'access': 'abc'}}
+        entry = self.format(make_record('Received %s from %s', (data, {'HTTP_AUTHORIZATION': 'Bearer abc'})))
+        self.assertNotIn('hunter2', entry['message'])
+        self.assertNotIn('abc', entry['message'])
+        self.assertIn('a@example.com', entry['message'])
+
+    def test_redacts_extras(self):
+        entry = self.format(make_record(
+            access_token='abc', request_data={'user': {'email': 'a@example.com', 'password': 'hunter2'}},
+            status_code=400,
+        ))
+        self.assertEqual(entry['access_token'], REDACTED)
+        self.assertEqual(entry['request_data'], {'user': {'email': 'a@example.com', 'password': REDACTED}})
+        self.assertEqual(entry['status_code'], 400)
+
+    def test_logger_call_is_redacted_end_to_end(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JSONFormatter())
+        logger = logging.getLogger('sello.tests.redaction')
+        logger.addHandler(handler)
+        logger.propagate = False
+        self.addCleanup(logger.removeHandler, handler)
+        logger.warning("Signup data: %s", {'password': 'hunter2'}, extra={'session_id': 's3ss'})
+        self.assertNotIn('hunter2', stream.getvalue())
+        self.assertNotIn('s3ss', stream.getvalue())
+
+
+class SamplingFilterTests(SimpleTestCase):
+    def kept(self, sampling, name, level, tries=200):
+        return sum(sampling.filter(make_record(name=name, level=level)) for _ in range(tries))
+
+    def test_warnings_and_above_are_always_kept(self):
+        sampling = SamplingFilter({'': 0.0})
+        for level in (logging.WARNING, logging.ERROR, logging.CRITICAL):
+            self.assertEqual(self.kept(sampling, 'users.views', level), 200)
+
+    def test_rate_of_the_closest_listed_logger_applies(self):
+        sampling = SamplingFilter({'users': 0.0, 'users.views.orders': 1.0})
+        self.assertEqual(self.kept(sampling, 'users.views', logging.INFO), 0)
+        self.assertEqual(self.kept(sampling, 'users.views.orders', logging.DEBUG), 200)
+        self.assertEqual(self.kept(sampling, 'users.views.orders.detail', logging.INFO), 200)
+        self.assertEqual(self.kept(sampling, 'django.request', logging.INFO), 200)
+
+    def test_partial_rate_keeps_some(self):
+        kept = self.kept(SamplingFilter({'users': 0.5}), 'users', logging.INFO, tries=1000)
+        self.assertTrue(300 < kept < 700, kept)
+
+
+class QueueHandlerTests(TestCase):
+    def make_handler(self, **kwargs):
+        stream = io.StringIO()
+        handler = QueueHandler(stream, **kwargs)
+        handler.set_name('test-queue')
+        handler.setFormatter(JSONFormatter())
+        self.addCleanup(handler.stop)
+        return handler, stream
+
+    def test_writes_redacted_json_lines_off_thread(self):
+        handler, stream = self.make_handler()
+        handler.handle(make_record('Token %s', ({'token': 'abc'},)))
+        handler.stop()
+        entry = json.loads(stream.getvalue())
+        self.assertEqual(entry['message'], f"Token {{'token': '{REDACTED}'}}")
+
+    def test_full_queue_drops_and_exports_the_count(self):
+        handler, stream = self.make_handler(max_size=0)
+        for _ in range(3):
+            handler.handle(make_record())
+        handler.stop()
+        self.assertEqual(stream.getvalue(), '')
+        self.assertEqual(handler.dropped, 3)
+        samples = [sample for sample in collect() if sample[0] == 'sello_log_records_dropped_total']
+        self.assertIn(['sello_log_records_dropped_total', 'counter',
+                       'Log records dropped because the log queue was full.', [('handler', 'test-queue')], 3],
+                      samples)
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from sello.metrics import load_snapshots, maybe_spool, render
+
+
+class MetricsEndpointTests(TestCase):
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_closed_without_token_outside_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=True)
+    def test_open_without_token_in_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='s3cret', DEBUG=True)
+    def test_requires_the_token_when_set(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('sello_requests_total', response.content.decode())
+
+
+class MetricsSpoolTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        override = override_settings(METRICS_SPOOL_DIR=self.directory)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write_snapshot(self, pid, value):
+        labels = [['method', 'GET'], ['view', 'spool-test'], ['status', '200']]
+        snapshot = {'histograms': [], 'counters': [['sello_requests_total', labels, value]]}
+        path = os.path.join(self.directory, f'{pid}.json')
+        with open(path, 'w') as f:
+            json.dump(snapshot, f)
+        return path
+
+    def test_dead_workers_snapshots_are_dropped(self):
+        worker = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        self.addCleanup(worker.kill)
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+        live_path = self.write_snapshot(worker.pid, 5)
+        dead_path = self.write_snapshot(dead.pid, 7)
+
+        output = render(load_snapshots())
+        self.assertIn('sello_requests_total{method="GET",view="spool-test",status="200"} 5\n', output)
+        self.assertTrue(os.path.exists(live_path))
+        self.assertFalse(os.path.exists(dead_path))
+
+    def test_own_snapshot_is_written_but_read_live(self):
+        maybe_spool(force=True)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, f'{os.getpid()}.json')))
+        self.assertEqual(len(load_snapshots()), 1)
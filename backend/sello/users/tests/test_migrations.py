@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class BackfillMigrationTests(TransactionTestCase):
+    """Backfills run on historical models only, so they keep working as the live code changes."""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('users', target)])
+        return executor.loader.project_state([('users', target)]).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes('users')[0][1])
+
+    def make_history(self, apps):
+        User = apps.get_model('users', 'User')
+        Product = apps.get_model('users', 'Product')
+        Order = apps.get_model('users', 'Order')
+        OrderItem = apps.get_model('users', 'OrderItem')
+        shopkeeper = User.objects.create(email='shop@example.com', role='SHOPKEEPER')
+        customer = User.objects.create(email='customer@example.com', role='CUSTOMER')
+        product = Product.objects.create(
+            name='Milk', description='d', price='2.00', category='Dairy', subcategory='Milk', stock=5,
+            created_by=shopkeeper,
+        )
+        for quantity in (1, 3):
+            order = Order.objects.create(user=customer, total_amount='0', shipping_address='x')
+            OrderItem.objects.create(order=order, product=product, quantity=quantity, price='2.00', product_name='Milk')
+        return shopkeeper, product
+
+    def test_sales_rollups_backfill(self):
+        shopkeeper, product = self.make_history(self.migrate('0004_keyset_indexes'))
+        apps = self.migrate('0005_sales_rollups')
+        sales = apps.get_model('users', 'ShopkeeperSales').objects.get(shopkeeper_id=shopkeeper.pk)
+        self.assertEqual((sales.total_sales, sales.units_sold, sales.order_count), (Decimal('8.00'), 4, 2))
+        product_sales = apps.get_model('users', 'ProductSales').objects.get(product_id=product.pk)
+        self.assertEqual(product_sales.units_sold, 4)
+
+    def test_order_shopkeeper_links_backfill(self):
+        shopkeeper, product = self.make_history(self.migrate('0007_stock_reservations'))
+        apps = self.migrate('0008_order_shopkeeper_links')
+        links = apps.get_model('users', 'OrderShopkeeper').objects.all()
+        self.assertEqual(links.count(), 2)
+        self.assertEqual({link.shopkeeper_id for link in links}, {shopkeeper.pk})
@@ -0,0 +1,45 @@
+from .base import APITestCase
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.products = [self.make_product(self.shopkeeper, name=f'Product {n}') for n in range(5)]
+        self.client = self.client_for(self.make_user('customer@example.com'))
+
+    def names(self, response):
+        return [product['name'] for product in response.data['results']]
+
+    def test_pages_forward_then_back(self):
+        first = self.client.get('/users/products/', {'page_size': 2})
+        self.assertEqual(self.names(first), ['Product 4', 'Product 3'])
+        self.assertIsNone(first.data['previous'])
+
+        second = self.client.get(first.data['next'])
+        self.assertEqual(self.names(second), ['Product 2', 'Product 1'])
+        third = self.client.get(second.data['next'])
+        self.assertEqual(self.names(third), ['Product 0'])
+        self.assertIsNone(third.data['next'])
+
+        back = self.client.get(third.data['previous'])
+        self.assertEqual(self.names(back), ['Product 2', 'Product 1'])
+        start = self.client.get(back.data['previous'])
+        self.assertEqual(self.names(start), ['Product 4', 'Product 3'])
+        self.assertIsNone(start.data['previous'])
+        self.assertEqual(self.names(self.client.get(start.data['next'])), ['Product 2', 'Product 1'])
+
+    def test_ties_on_created_at_are_ordered_by_id(self):
+        created_at = self.products[0].created_at
+        for product in self.products:
+            type(product).objects.filter(pk=product.pk).update(created_at=created_at)
+        seen = []
+        url, params = '/users/products/', {'page_size': 2}
+        while url:
+            response = self.client.get(url, params)
+            seen += self.names(response)
+            url, params = response.data['next'], None
+        self.assertEqual(seen, [f'Product {n}' for n in reversed(range(5))])
+
+    def test_rejects_a_malformed_cursor(self):
+        self.assertEqual(self.client.get('/users/products/', {'cursor': 'not-a-cursor'}).status_code, 404)
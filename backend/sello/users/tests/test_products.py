@@ -0,0 +1,47 @@
+from users.models import Product
+from users.reservations import reserve_cart
+
+from .base import APITestCase
+
+
+class ProductUpdateTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.client = self.client_for(self.shopkeeper)
+        self.product = self.make_product(self.shopkeeper, stock=10)
+
+    def patch(self, data):
+        return self.client.patch(f'/users/products/{self.product.pk}/', data, format='json')
+
+    def hold(self, quantity):
+        customer = self.make_user('customer@example.com')
+        customer.cart_items.create(product=self.product, quantity=quantity)
+        reserve_cart(customer)
+
+    def test_stock_cannot_drop_below_held_units(self):
+        self.hold(6)
+        response = self.patch({'stock': 5})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('6 units are held', response.json()['stock'][0])
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reserved_stock), (10, 6))
+
+        response = self.patch({'stock': 6, 'name': 'Skimmed milk'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['available_stock'], 0)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.name, self.product.stock), ('Skimmed milk', 6))
+
+    def test_editing_other_fields_leaves_stock_alone(self):
+        self.client.get(f'/users/products/{self.product.pk}/')
+        # Taken by a checkout after this instance was loaded.
+        Product.objects.filter(pk=self.product.pk).update(stock=4)
+        self.assertEqual(self.patch({'price': '3.00'}).status_code, 200)
+        self.product.refresh_from_db()
+        self.assertEqual((str(self.product.price), self.product.stock), ('3.00', 4))
+
+    def test_update_invalidates_cached_detail(self):
+        self.assertEqual(self.client.get(f'/users/products/{self.product.pk}/').json()['stock'], 10)
+        self.patch({'stock': 12})
+        self.assertEqual(self.client.get(f'/users/products/{self.product.pk}/').json()['stock'], 12)
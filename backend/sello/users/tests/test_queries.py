@@ -0,0 +1,51 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from users.models import CartItem, Order, OrderItem
+
+from .base import APITestCase
+
+
+class ListQueryCountTests(APITestCase):
+    """List endpoints load relations up front, so their query count does not grow with the page."""
+
+    def setUp(self):
+        super().setUp()
+        self.customer = self.make_user('customer@example.com')
+        self.client = self.client_for(self.customer)
+        self.rows = 0
+
+    def add_rows(self, count):
+        for _ in range(count):
+            self.rows += 1
+            owner = self.make_user(f'shop{self.rows}@example.com', role='SHOPKEEPER')
+            product = self.make_product(owner, name=f'Product {self.rows}')
+            CartItem.objects.create(user=self.customer, product=product, quantity=1)
+            order = Order.objects.create(user=self.customer, total_amount='2.00', shipping_address='1 Main St')
+            OrderItem.objects.create(order=order, product=product, quantity=1, price='2.00', product_name=product.name)
+            OrderItem.objects.create(order=order, product=None, quantity=1, price='1.00', product_name='Gone')
+
+    def count_queries(self, url):
+        self.clear_caches()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(response.data['results']), len(queries)
+
+    def assert_constant_queries(self, url):
+        self.add_rows(1)
+        rows, one = self.count_queries(url)
+        self.assertEqual(rows, 1)
+        self.add_rows(4)
+        rows, many = self.count_queries(url)
+        self.assertEqual(rows, 5)
+        self.assertEqual(many, one)
+
+    def test_products(self):
+        self.assert_constant_queries('/users/products/')
+
+    def test_orders(self):
+        self.assert_constant_queries('/users/orders/')
+
+    def test_cart(self):
+        self.assert_constant_queries('/users/cart/')
@@ -0,0 +1,38 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from sello.routers import _scope, replica_reads
+
+
+class ReplicaReadsTests(SimpleTestCase):
+    def test_decorator_is_safe_for_overlapping_calls(self):
+        both_inside = threading.Barrier(2, timeout=5)
+        errors = []
+
+        @replica_reads()
+        def view():
+            both_inside.wait()
+            return _scope.get()
+
+        def call():
+            try:
+                self.assertIsNotNone(view())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertIsNone(_scope.get())
+
+    def test_nested_scopes_share_the_outer_one(self):
+        with replica_reads():
+            outer = _scope.get()
+            with replica_reads():
+                self.assertIs(_scope.get(), outer)
+            self.assertIs(_scope.get(), outer)
+        self.assertIsNone(_scope.get())
@@ -0,0 +1,27 @@
+from .base import APITestCase
+
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+
+    def search(self, query):
+        return self.client_for(self.customer).get('/users/products/search/', {'q': query}).json()
+
+    def test_finds_product_created_after_migrating(self):
+        # Guards the FTS sync triggers against table rebuilds in later migrations.
+        product = self.make_product(self.shopkeeper, name='Green apple juice')
+        data = self.search('apple')
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'][0]['id'], product.pk)
+
+    def test_index_follows_renames_and_deletes(self):
+        product = self.make_product(self.shopkeeper, name='Green apple juice')
+        product.name = 'Orange juice'
+        product.save()
+        self.assertEqual(self.search('apple')['count'], 0)
+        self.assertEqual(self.search('orange')['count'], 1)
+        product.delete()
+        self.assertEqual(self.search('orange')['count'], 0)
@@ -0,0 +1,88 @@
+import json
+import warnings
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import Order, OrderItem
+from users.shopkeeper_orders import link_order_shopkeepers
+from users.views import ProductViewSet
+
+from .base import APITestCase
+
+
+def paginated_results(client, url):
+    results, params = [], {'page_size': 2}
+    while url:
+        data = client.get(url, params).json()
+        results += data['results']
+        url, params = data['next'], None
+    return results
+
+
+class StreamTestMixin:
+    """Compares ``?stream=1`` with the paginated list, under WSGI and ASGI."""
+
+    def streamed(self, user, url):
+        response = self.client_for(user).get(url, {'stream': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        return list(response.streaming_content)
+
+    def astreamed(self, user, url):
+        headers = {'authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+        async def fetch():
+            response = await AsyncClient().get(url, {'stream': '1'}, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            with warnings.catch_warnings():
+                # Django warns when it has to buffer a sync iterator under ASGI.
+                warnings.simplefilter('error')
+                return [chunk async for chunk in response.streaming_content]
+
+        return async_to_sync(fetch)()
+
+    def assert_streams_like_pages(self, user, url):
+        expected = paginated_results(self.client_for(user), url)
+        self.assertTrue(expected)
+        for chunks in (self.streamed(user, url), self.astreamed(user, url)):
+            self.assertEqual(json.loads(b''.join(chunks)), expected)
+        return chunks
+
+
+class StreamingListTests(StreamTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.shopkeeper = self.make_user('shop@example.com', role='SHOPKEEPER')
+        self.customer = self.make_user('customer@example.com')
+        products = [self.make_product(self.shopkeeper, name=f'Product {n}') for n in range(5)]
+        for product in products:
+            order = Order.objects.create(user=self.customer, total_amount='2.00', shipping_address='1 Main St')
+            item = OrderItem.objects.create(
+                order=order, product=product, quantity=1, price='2.00', product_name=product.name,
+            )
+            link_order_shopkeepers(order, [item])
+        products[0].delete()
+
+    def test_products(self):
+        self.assert_streams_like_pages(self.customer, '/users/products/')
+
+    def test_customer_orders(self):
+        self.assert_streams_like_pages(self.customer, '/users/orders/')
+
+    def test_shopkeeper_orders(self):
+        self.assert_streams_like_pages(self.shopkeeper, '/users/orders/')
+
+    def test_rows_are_sent_in_chunks(self):
+        with mock.patch.object(ProductViewSet, 'stream_chunk_size', 3):
+            chunks = self.assert_streams_like_pages(self.customer, '/users/products/')
+        # '[', the first three of the four products, the fourth, ']'
+        self.assertEqual(len(chunks), 4)
+
+    def test_empty_result(self):
+        other = self.make_user('other@example.com')
+        self.assertEqual(b''.join(self.streamed(other, '/users/orders/')), b'[]')
+        self.assertEqual(b''.join(self.astreamed(other, '/users/orders/')), b'[]')
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     SignUpView, SignInView, SignOutView, RefreshTokenView,
     CartViewSet, OrderViewSet, dashboard,
@@ -11,10 +13,15 @@ router.register(r'cart', CartViewSet, basename='cart')
 router.register(r'orders', OrderViewSet, basename='order')
 router.register(r'products', ProductViewSet, basename='product')
 
+if settings.ASYNC_AUTH_VIEWS:
+    signup_view, signin_view = async_views.sign_up, async_views.sign_in
+else:
+    signup_view, signin_view = SignUpView.as_view(), SignInView.as_view()
+
 urlpatterns = [
     path('', include(router.urls)),
-    path('signup/', SignUpView.as_view(), name='signup'),
-    path('signin/', SignInView.as_view(), name='signin'),
+    path('signup/', signup_view, name='signup'),
+    path('signin/', signin_view, name='signin'),
     path('signout/', SignOutView.as_view(), name='signout'),
     path('token/refresh/', RefreshTokenView.as_view(), name='token_refresh'),
     path('dashboard/', dashboard, name='dashboard'),
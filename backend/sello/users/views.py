@@ -1,18 +1,38 @@
 from rest_framework import status, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from django.contrib.auth import authenticate
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Count, Max
 import logging
-from .models import User, Product, CartItem, Order
+from decimal import Decimal
+from .models import User, Product, ProductImport, CartItem, Order
+from .blacklist import RefreshToken, TokenRefreshSerializer
+from .cart import apply_cart_operations
+from .cache import CatalogCacheMixin, instance_scope, owner_scope, table_scope
+from .compiled import CompiledListMixin
+from .conditional import ConditionalGetMixin
+from .dashboard import dashboard_cache, dashboard_scope
+from .imports import (
+    FORMATS, ProductImporter, checkpoint_as_dict, file_digest, get_checkpoint, guess_format, read_rows,
+)
+from .pagination import KeysetPagination
+from .reservations import release_reservations, reserve_cart
+from .sales import get_shopkeeper_sales
+from .search import search_products
+from .shopkeeper_orders import ORDERING as SHOPKEEPER_ORDERING, shopkeeper_orders
+from .streaming import StreamingListMixin, is_asgi, stream_queryset, wants_stream
+from sello.routers import ReplicaReadsMixin, pin_to_primary, replica_reads
 from .serializers import (
     UserSerializer, ProductSerializer,
     CartItemSerializer, OrderSerializer,
-    LoginSerializer
+    LoginSerializer, CartBatchSerializer, CartSummarySerializer
 )
 
 logger = logging.getLogger(__name__)
@@ -21,7 +41,7 @@ class SignUpView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        logger.info(f"Registration attempt with data: {request.data}")
+        logger.debug("Registration attempt with data: %s", request.data)
         
         try:
             serializer = UserSerializer(data=request.data)
@@ -35,14 +55,14 @@ class SignUpView(APIView):
                     'user': serializer.data
                 }
                 
-                logger.info(f"Registration successful for user: {user.email}")
+                logger.info("Registration successful for user: %s", user.email)
                 return Response(response_data, status=status.HTTP_201_CREATED)
             
-            logger.error(f"Registration validation failed: {serializer.errors}")
+            logger.error("Registration validation failed: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
         except Exception as e:
-            logger.error(f"Registration error: {str(e)}")
+            logger.error("Registration error: %s", e)
             return Response(
                 {'error': 'Registration failed. Please try again.'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -52,7 +72,7 @@ class SignInView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        logger.info(f"Login attempt with data: {request.data}")
+        logger.debug("Login attempt with data: %s", request.data)
         
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
@@ -65,10 +85,10 @@ class SignInView(APIView):
                 'access': str(refresh.access_token),
                 'user': UserSerializer(user).data
             }
-            logger.info(f"Login successful for user: {user.email}")
+            logger.info("Login successful for user: %s", user.email)
             return Response(response_data)
             
-        logger.error(f"Login validation failed: {serializer.errors}")
+        logger.error("Login validation failed: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class SignOutView(APIView):
@@ -84,18 +104,136 @@ class SignOutView(APIView):
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
 class RefreshTokenView(TokenRefreshView):
-    pass
+    serializer_class = TokenRefreshSerializer
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ReplicaReadsMixin, ConditionalGetMixin, StreamingListMixin, CatalogCacheMixin,
+                     CompiledListMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    replica_actions = ('list', 'retrieve', 'search')
+    conditional_actions = ('list', 'retrieve', 'search')
 
     def get_queryset(self):
         user = self.request.user
         if user.role == 'SHOPKEEPER':
-            return Product.objects.filter(created_by=user)
-        return Product.objects.all()
+            queryset = Product.objects.filter(created_by=user)
+        else:
+            queryset = Product.objects.all()
+        return self.get_serializer_class().setup_eager_loading(queryset)
+
+    def get_cache_audience(self):
+        # Shopkeepers only see their own products.
+        user = self.request.user
+        return f'owner:{user.pk}' if user.role == 'SHOPKEEPER' else 'all'
+
+    def get_list_cache_scopes(self):
+        user = self.request.user
+        if user.role == 'SHOPKEEPER':
+            return [owner_scope(Product, user.pk)]
+        return [table_scope(Product)]
+
+    def get_detail_cache_scopes(self, pk):
+        return [instance_scope(Product, pk)]
+
+    def get_etag_parts(self):
+        # The catalog cache's version stamps change on every write that could change the response.
+        if self.action == 'retrieve':
+            scopes = self.get_detail_cache_scopes(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        else:
+            scopes = self.get_list_cache_scopes()
+        return self.catalog_cache.get_versions(scopes)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text product search with category/subcategory facets."""
+        return self.conditional(request, lambda: self._search_response(request))
+
+    def _search_response(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Search query is required'}, status=status.HTTP_400_BAD_REQUEST)
+        data = self.catalog_cache.get_or_set(
+            f'{self.basename}:search:{self.get_cache_audience()}:{request.build_absolute_uri()}',
+            self.get_list_cache_scopes(),
+            lambda: self._search(request, query),
+        )
+        return Response(data)
+
+    def _search(self, request, query):
+        page_size = self.paginator.get_page_size(request)
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+
+        user = request.user
+        result = search_products(
+            query,
+            owner=user if user.role == 'SHOPKEEPER' else None,
+            category=request.query_params.get('category'),
+            subcategory=request.query_params.get('subcategory'),
+            limit=page_size,
+            offset=(page - 1) * page_size,
+        )
+        products = self.get_serializer_class().setup_eager_loading(Product.objects.all()).in_bulk(result.product_ids)
+        serializer = self.get_serializer([products[pk] for pk in result.product_ids if pk in products], many=True)
+
+        url = request.build_absolute_uri()
+        return {
+            'count': result.count,
+            'next': replace_query_param(url, 'page', page + 1) if page * page_size < result.count else None,
+            'previous': replace_query_param(url, 'page', page - 1) if page > 1 else None,
+            'facets': result.facets,
+            'results': serializer.data,
+        }
+
+    @action(detail=False, methods=['get', 'post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_products(self, request):
+        """
+        Bulk-create the shopkeeper's products from an uploaded CSV or JSONL
+        ``file`` (POST), or report how far the import ``import_id`` got (GET).
+
+        Progress is checkpointed server-side after every chunk under
+        ``import_id`` (by default a digest of the file), so posting the same
+        file again after an interruption resumes where it stopped; an
+        explicit ``start_row`` overrides the checkpoint.
+        """
+        if request.user.role != 'SHOPKEEPER':
+            return Response({'error': 'Only shopkeepers can import products'}, status=status.HTTP_403_FORBIDDEN)
+        if request.method == 'GET':
+            checkpoint = ProductImport.objects.filter(
+                owner=request.user, key=request.query_params.get('import_id', '')
+            ).first()
+            if checkpoint is None:
+                return Response({'error': 'No such import'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(checkpoint_as_dict(checkpoint))
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'A CSV or JSONL file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('format') or guess_format(upload.name)
+        if file_format not in FORMATS:
+            return Response({'error': f"Format must be one of {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        import_id = request.data.get('import_id') or file_digest(upload)
+        if len(import_id) > 64:
+            return Response({'error': 'import_id must be at most 64 characters'}, status=status.HTTP_400_BAD_REQUEST)
+        checkpoint = get_checkpoint(request.user, import_id)
+        if 'start_row' in request.data:
+            try:
+                start_row = int(request.data['start_row'])
+            except ValueError:
+                return Response({'error': 'start_row must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        elif checkpoint.finished:
+            return Response(checkpoint_as_dict(checkpoint))
+        else:
+            start_row = checkpoint.next_row
+
+        report = ProductImporter(request.user, start_row=start_row, checkpoint=checkpoint).run(
+            read_rows(upload, file_format)
+        )
+        return Response({'import_id': import_id, **report.as_dict()})
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -103,53 +241,137 @@ class ProductViewSet(viewsets.ModelViewSet):
 class CartViewSet(viewsets.ModelViewSet):
     serializer_class = CartItemSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    pagination_ordering = ('-added_at', '-id')
 
     def get_queryset(self):
-        return CartItem.objects.filter(user=self.request.user)
+        queryset = CartItem.objects.filter(user=self.request.user)
+        return self.get_serializer_class().setup_eager_loading(queryset)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class OrderViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Apply a list of add/set/remove operations to the cart in one transaction."""
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product_ids = apply_cart_operations(request.user, serializer.validated_data['operations'])
+        return Response(cart_lines_response(request.user, product_ids))
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """Line count, unit count and total of the cart, without loading its products."""
+        summary = CartItem.objects.filter(user=request.user).summary()
+        return Response(CartSummarySerializer(summary).data)
+
+class OrderViewSet(ReplicaReadsMixin, ConditionalGetMixin, StreamingListMixin, CompiledListMixin,
+                   viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    replica_actions = ('list',)
 
     def get_queryset(self):
         user = self.request.user
         if user.role == 'SHOPKEEPER':
-            return Order.objects.filter(items__product__created_by=user).distinct()
-        return Order.objects.filter(user=user)
+            queryset = shopkeeper_orders(user)
+        else:
+            queryset = Order.objects.filter(user=user)
+        return self.get_serializer_class().setup_eager_loading(queryset)
+
+    @property
+    def pagination_ordering(self):
+        if self.request.user.role == 'SHOPKEEPER':
+            return SHOPKEEPER_ORDERING
+        return KeysetPagination.ordering
+
+    def get_etag_parts(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            queryset = queryset.filter(pk=self.kwargs['pk'])
+        summary = queryset.order_by().aggregate(updated=Max('updated_at'), count=Count('id'))
+        self._last_modified = summary['updated'] if self.action == 'retrieve' else None
+        return [summary['updated'], summary['count']]
+
+    def get_last_modified(self):
+        return self._last_modified
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def dashboard(request):
-    user = request.user
+    @action(detail=False, methods=['post', 'delete'])
+    def checkout(self, request):
+        """Begin checkout by holding stock for the cart (POST), or give the hold back (DELETE)."""
+        if request.method == 'DELETE':
+            release_reservations(user=request.user)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        reservations = reserve_cart(request.user)
+        return Response({
+            'expires_at': reservations[0].expires_at,
+            'items': [
+                {'product_id': reservation.product_id, 'quantity': reservation.quantity}
+                for reservation in reservations
+            ],
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def reorder(self, request, pk=None):
+        """Add every still-available product of a past order back to the cart."""
+        order = self.get_object()
+        if order.user_id != request.user.pk:
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        operations = [
+            {'op': 'add', 'product_id': item.product_id, 'quantity': item.quantity}
+            for item in order.items.all()
+            if item.product_id is not None
+        ]
+        product_ids = apply_cart_operations(request.user, operations) if operations else []
+        return Response(cart_lines_response(request.user, product_ids))
+
+def cart_lines_response(user, product_ids):
+    cart_items = CartItemSerializer.setup_eager_loading(
+        CartItem.objects.filter(user=user, product_id__in=product_ids)
+    )
+    return {'items': CartItemSerializer(cart_items, many=True).data}
+
+def get_dashboard(user):
+    """``user``'s dashboard data, from ``dashboard_cache`` (see ``users.dashboard``)."""
+
+    def compute():
+        # The entry lives until the next write bumps it, so never fill it from a lagging replica.
+        pin_to_primary()
+        return build_dashboard(user)
+
+    return dashboard_cache.get_or_set(f'{user.role}:{user.pk}', [dashboard_scope(user.pk)], compute)
+
+def build_dashboard(user):
     if user.role == 'SHOPKEEPER':
         # Shopkeeper dashboard
         products = Product.objects.filter(created_by=user)
-        orders = Order.objects.filter(items__product__created_by=user).distinct()
+        orders = shopkeeper_orders(user)
         
-        total_sales = sum(order.total_amount for order in orders)
+        total_sales = get_shopkeeper_sales(user)
         total_products = products.count()
-        recent_orders = orders.order_by('-created_at')[:5]
+        recent_orders = OrderSerializer.setup_eager_loading(orders).order_by(*SHOPKEEPER_ORDERING)[:5]
         
         data = {
             'total_sales': total_sales,
             'total_products': total_products,
             'recent_orders': OrderSerializer(recent_orders, many=True).data,
-            'products': ProductSerializer(products, many=True).data
+            'products': ProductSerializer(ProductSerializer.setup_eager_loading(products), many=True).data
         }
     else:
         # Customer dashboard
         orders = Order.objects.filter(user=user)
-        cart_items = CartItem.objects.filter(user=user)
+        cart_items = list(CartItemSerializer.setup_eager_loading(CartItem.objects.filter(user=user)))
         
         total_orders = orders.count()
-        cart_total = sum(item.total_price for item in cart_items)
-        recent_orders = orders.order_by('-created_at')[:5]
+        # Line totals come from SQL (CartItem.objects.with_totals()).
+        cart_total = sum((item.total_price for item in cart_items), Decimal('0.00'))
+        recent_orders = OrderSerializer.setup_eager_loading(orders).order_by('-created_at')[:5]
         
         data = {
             'total_orders': total_orders,
@@ -158,7 +380,13 @@ def dashboard(request):
             'cart_items': CartItemSerializer(cart_items, many=True).data
         }
     
-    return Response(data)
+    return data
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@replica_reads()
+def dashboard(request):
+    return Response(get_dashboard(request.user))
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
@@ -167,7 +395,9 @@ def cart(request):
     try:
         if request.method == 'GET':
             # Get user's cart items
-            cart_items = CartItem.objects.filter(user=request.user)
+            cart_items = CartItemSerializer.setup_eager_loading(
+                CartItem.objects.filter(user=request.user)
+            )
             serializer = CartItemSerializer(cart_items, many=True)
             return Response(serializer.data)
             
@@ -179,14 +409,15 @@ def cart(request):
             if not product_id:
                 return Response({'error': 'Product ID is required'}, status=status.HTTP_400_BAD_REQUEST)
                 
-            product = Product.objects.get(id=product_id)
-            cart_item, created = CartItem.objects.get_or_create(user=request.user, product=product)
-            cart_item.quantity += quantity
-            cart_item.save()
+            apply_cart_operations(request.user, [
+                {'op': 'add', 'product_id': product_id, 'quantity': int(quantity)}
+            ])
             return Response({'message': 'Item added to cart'}, status=status.HTTP_201_CREATED)
             
+    except ValidationError as e:
+        return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        logger.error(f"Error in cart: {str(e)}")
+        logger.error("Error in cart: %s", e)
         return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['PUT', 'DELETE'])
@@ -212,7 +443,7 @@ def cart_item(request, item_id):
             return Response({'message': 'Item removed from cart'})
             
     except Exception as e:
-        logger.error(f"Error in cart_item: {str(e)}")
+        logger.error("Error in cart_item: %s", e)
         return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET', 'POST'])
@@ -222,21 +453,27 @@ def orders(request):
     try:
         if request.method == 'GET':
             # Get user's orders
-            orders = Order.objects.filter(user=request.user)
+            if wants_stream(request):
+                return stream_queryset(
+                    Order.objects.filter(user=request.user).order_by('-created_at', '-id'), OrderSerializer,
+                    asynchronous=is_asgi(request),
+                )
+            orders = OrderSerializer.setup_eager_loading(Order.objects.filter(user=request.user))
             serializer = OrderSerializer(orders, many=True)
             return Response(serializer.data)
             
         elif request.method == 'POST':
             # Create new order from cart
-            cart_items = CartItem.objects.filter(user=request.user)
-            order = Order.objects.create(user=request.user)
-            for item in cart_items:
-                order.items.add(item)
-                item.delete()
+            serializer = OrderSerializer(data=request.data, context={'request': request})
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            serializer.save()
             return Response({'message': 'Order created successfully'}, status=status.HTTP_201_CREATED)
             
+    except ValidationError as e:
+        return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        logger.error(f"Error in orders: {str(e)}")
+        logger.error("Error in orders: %s", e)
         return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
@@ -244,64 +481,40 @@ def orders(request):
 def order_detail(request, order_id):
     """Get detailed information about a specific order."""
     try:
-        order = Order.objects.get(id=order_id)
+        order = OrderSerializer.setup_eager_loading(Order.objects.all()).get(id=order_id)
         serializer = OrderSerializer(order)
         return Response(serializer.data)
         
     except Exception as e:
-        logger.error(f"Error in order_detail: {str(e)}")
+        logger.error("Error in order_detail: %s", e)
         return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def shopkeeper_dashboard(request):
     """Get dashboard data for shopkeepers."""
     try:
         if request.user.role != 'SHOPKEEPER':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
             
-        products = Product.objects.filter(created_by=request.user)
-        orders = Order.objects.filter(items__product__created_by=request.user).distinct()
-        
-        total_sales = sum(order.total_amount for order in orders)
-        total_products = products.count()
-        recent_orders = orders.order_by('-created_at')[:5]
-        
-        data = {
-            'total_sales': total_sales,
-            'total_products': total_products,
-            'recent_orders': OrderSerializer(recent_orders, many=True).data,
-            'products': ProductSerializer(products, many=True).data
-        }
-        return Response(data)
+        return Response(get_dashboard(request.user))
         
     except Exception as e:
-        logger.error(f"Error in shopkeeper_dashboard: {str(e)}")
+        logger.error("Error in shopkeeper_dashboard: %s", e)
         return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads()
 def customer_dashboard(request):
     """Get dashboard data for customers."""
     try:
         if request.user.role != 'CUSTOMER':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
             
-        orders = Order.objects.filter(user=request.user)
-        cart_items = CartItem.objects.filter(user=request.user)
-        
-        total_orders = orders.count()
-        cart_total = sum(item.total_price for item in cart_items)
-        recent_orders = orders.order_by('-created_at')[:5]
-        
-        data = {
-            'total_orders': total_orders,
-            'cart_total': cart_total,
-            'recent_orders': OrderSerializer(recent_orders, many=True).data,
-            'cart_items': CartItemSerializer(cart_items, many=True).data
-        }
-        return Response(data)
+        return Response(get_dashboard(request.user))
         
     except Exception as e:
-        logger.error(f"Error in customer_dashboard: {str(e)}")
+        logger.error("Error in customer_dashboard: %s", e)
         return Response({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)